@@ -0,0 +1,109 @@
+"""
+Benchmark contact extraction from a stored business homepage fixture.
+
+Compares the previous BeautifulSoup path (full DOM, get_text() plus the email
+regex over the whole text, and separate <a> walks for social and contact
+links) with the single-pass extractor in extractors.fast_extract. A second
+case adds a long unbroken run of word characters next to an '@', which is
+what made the old regex scan slow on some pages.
+
+Usage:
+    python benchmarks/bench_extract.py [--repeat 50]
+"""
+import argparse
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Set
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from extractors.fast_extract import CONTACT_LINK_KEYWORDS, EMAIL_REGEX, SOCIAL_DOMAINS, extract_page  # type: ignore
+
+BASE_URL = "https://www.acmeplumbing.com/"
+
+def legacy_extract(content: bytes) -> Dict[str, Any]:
+    soup = BeautifulSoup(content.decode("utf-8"), "lxml")
+    text = soup.get_text(" ", strip=True)
+    emails = set(match.group(0) for match in EMAIL_REGEX.finditer(text))
+
+    social: Dict[str, Set[str]] = defaultdict(set)
+    for a in soup.find_all("a", href=True):
+        href = a["href"].strip()
+        if href.startswith("#") or not href:
+            continue
+        full_url = urljoin(BASE_URL, href)
+        domain = urlparse(full_url).netloc.lower()
+        for platform, domains in SOCIAL_DOMAINS.items():
+            if any(d in domain for d in domains):
+                social[platform].add(full_url)
+
+    links: Set[str] = set()
+    for a in soup.find_all("a", href=True):
+        href = a["href"].lower()
+        if any(kw in href for kw in CONTACT_LINK_KEYWORDS):
+            links.add(urljoin(BASE_URL, a["href"]))
+
+    return {"emails": emails, "social": social, "links": links}
+
+def fast_extract(content: bytes) -> Dict[str, Any]:
+    page = extract_page(content, BASE_URL, encoding="utf-8")
+    return {"emails": page.emails, "social": page.social, "links": page.contact_links}
+
+def flatten(result: Dict[str, Any]) -> Set[str]:
+    items = {f"email {e}" for e in result["emails"]} | {f"link {l}" for l in result["links"]}
+    for platform, urls in result["social"].items():
+        items |= {f"{platform} {u}" for u in urls}
+    return items
+
+def time_per_page(extract: Callable[[bytes], Any], content: bytes, repeat: int) -> List[float]:
+    timings: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        extract(content)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per case.")
+    args = parser.parse_args()
+
+    homepage = (FIXTURES_DIR / "business_homepage.html").read_bytes()
+    blob = b"<p>ref:" + b"a" * 4000 + b"@ see above</p>"
+    cases = {
+        "homepage": homepage,
+        "homepage + 4 KB token": homepage.replace(b"</main>", blob + b"</main>"),
+    }
+
+    # Show where the two paths disagree before timing them: the fast path adds
+    # mailto: addresses and skips substring false positives such as dropbox.com
+    # being counted as x.com.
+    legacy_items = flatten(legacy_extract(homepage))
+    fast_items = flatten(fast_extract(homepage))
+    for item in sorted(legacy_items - fast_items):
+        print(f"  only bs4:  {item}")
+    for item in sorted(fast_items - legacy_items):
+        print(f"  only fast: {item}")
+    print(f"  found by both: {len(legacy_items & fast_items)}")
+
+    for name, content in cases.items():
+        legacy_ms = statistics.median(time_per_page(legacy_extract, content, args.repeat)) * 1000
+        fast_ms = statistics.median(time_per_page(fast_extract, content, args.repeat)) * 1000
+        print(f"{name} ({len(content) // 1024} KB, {args.repeat} runs)")
+        print(f"  bs4 + get_text + regex: {legacy_ms:8.2f} ms/page (median)")
+        print(f"  single pass:            {fast_ms:8.2f} ms/page (median)")
+        print(f"  speedup:                {legacy_ms / fast_ms:8.1f}x")
+
+if __name__ == "__main__":
+    main()
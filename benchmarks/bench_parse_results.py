@@ -0,0 +1,108 @@
+"""
+Benchmark search results page parsing on the stored fixture pages.
+
+Compares the previous BeautifulSoup path (one soup for the listings and a
+second soup for the pagination check, select_one() per card field) with the
+single-parse lxml/XPath page model used by YellowPagesScraper._parse_page.
+
+Usage:
+    python benchmarks/bench_parse_results.py [--repeat 50]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from bs4 import BeautifulSoup
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from extractors.yellowpages_parser import YellowPagesScraper  # type: ignore
+
+def legacy_parse_listing(card: Any) -> Dict[str, Any]:
+    def text_or_not_found(element: Any) -> str:
+        if element is None:
+            return "Not Found"
+        text = element.get_text(strip=True)
+        return text if text else "Not Found"
+
+    name_el = card.select_one("a.business-name span, a.business-name")
+    address_el = card.select_one("p.adr, .street-address")
+    locality_el = card.select_one(".locality")
+    phone_el = card.select_one("div.phones, .phones")
+    website_el = card.select_one("a.track-visit-website, a.website-link, a[href^='http']")
+
+    name = text_or_not_found(name_el)
+    street = text_or_not_found(address_el)
+    locality = text_or_not_found(locality_el)
+    address = f"{street}, {locality}" if street != "Not Found" and locality != "Not Found" else street or locality
+    if not address or address == "Not Found, Not Found":
+        address = "Not Found"
+
+    listing_url_el = card.select_one("a.business-name")
+    return {
+        "name": name,
+        "address": address,
+        "phone": text_or_not_found(phone_el),
+        "website": website_el.get("href") if website_el and website_el.get("href") else "Not Found",
+        "listing_url": listing_url_el.get("href") if listing_url_el else None,
+    }
+
+def legacy_parse_page(html: str) -> Tuple[List[Dict[str, Any]], bool]:
+    soup = BeautifulSoup(html, "lxml")
+    # Same cards as CARDS_XPATH: a v-card nested in a div.result is that result, not another listing.
+    cards = [
+        card
+        for card in soup.select("div.result, div.v-card")
+        if "result" in card.get("class", []) or card.find_parent("div", class_="result") is None
+    ]
+    listings = [legacy_parse_listing(card) for card in cards]
+    listings = [listing for listing in listings if listing["name"] != "Not Found"]
+    has_next = bool(BeautifulSoup(html, "lxml").select_one("a.next, a.pagination-next, a[rel='next']"))
+    return listings, has_next
+
+def time_per_page(parse: Callable[[str], Any], pages: List[str], repeat: int) -> List[float]:
+    timings: List[float] = []
+    for _ in range(repeat):
+        for html in pages:
+            started = time.perf_counter()
+            parse(html)
+            timings.append(time.perf_counter() - started)
+    return timings
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50, help="Passes over the fixture pages.")
+    args = parser.parse_args()
+
+    pages = [path.read_text(encoding="utf-8") for path in sorted(FIXTURES_DIR.glob("search_results_*.html"))]
+    scraper = YellowPagesScraper(base_url="https://www.yellowpages.com")
+
+    # Sanity check: both paths must agree on names and pagination before timing them.
+    for html in pages:
+        legacy_listings, legacy_next = legacy_parse_page(html)
+        page = scraper._parse_page(html)
+        fields = ("name", "address", "phone", "website")
+        parsed = [listing.to_dict() for listing in page.listings]
+        assert [[l[f] for f in fields] for l in legacy_listings] == [[l[f] for f in fields] for l in parsed]
+        assert legacy_next == page.has_next
+
+    legacy = time_per_page(legacy_parse_page, pages, args.repeat)
+    single = time_per_page(scraper._parse_page, pages, args.repeat)
+
+    legacy_ms = statistics.median(legacy) * 1000
+    single_ms = statistics.median(single) * 1000
+    print(f"fixture pages:          {len(pages)} x {args.repeat} passes")
+    print(f"bs4, two parses:        {legacy_ms:8.2f} ms/page (median)")
+    print(f"lxml/xpath, one parse:  {single_ms:8.2f} ms/page (median)")
+    print(f"speedup:                {legacy_ms / single_ms:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark the full run_scraper pipeline against the local fixture server.
+
+The fixture server (benchmarks/fixture_server.py) runs in a child process so
+its memory does not count towards the scraper's peak RSS. The scraper runs
+in this process with a generated config pointing at the fixture server.
+Reported numbers: pages/sec (search and website pages), records/sec,
+p50/p95/p99 per-record enrichment latency and peak RSS.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--workers 8] [--pipeline] [--listings 300] [--site-latency 0.1]
+"""
+import argparse
+import json
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+if str(BENCH_DIR) not in sys.path:
+    sys.path.insert(0, str(BENCH_DIR))
+
+import runner  # type: ignore
+from fixture_server import FixtureConfig, add_fixture_arguments, fixture_config_from_args  # type: ignore
+
+def start_fixture_server(config: FixtureConfig) -> "tuple[subprocess.Popen, str]":
+    args = [sys.executable, str(BENCH_DIR / "fixture_server.py"), "--port", "0"]
+    for name, value in vars(config).items():
+        args += [f"--{name.replace('_', '-')}", str(value)]
+    proc = subprocess.Popen(args, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline() if proc.stdout else ""
+    match = re.search(r"http://[\d.]+:\d+", line)
+    if match is None:
+        proc.kill()
+        raise RuntimeError(f"Fixture server did not start: {line!r}")
+    return proc, match.group(0)
+
+def fetch_stats(base_url: str) -> Dict[str, int]:
+    with urllib.request.urlopen(f"{base_url}/stats", timeout=5) as resp:
+        return json.loads(resp.read())
+
+def timed_make_enricher(latencies: List[float]) -> Callable[..., Any]:
+    make_enricher = runner.make_enricher
+
+    def wrapper(*args: Any, **kwargs: Any) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        enrich_record = make_enricher(*args, **kwargs)
+
+        def timed(record: Dict[str, Any]) -> Dict[str, Any]:
+            started = time.perf_counter()
+            try:
+                return enrich_record(record)
+            finally:
+                latencies.append(time.perf_counter() - started)
+
+        return timed
+
+    return wrapper
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--pipeline", action="store_true", help="Use the streaming asyncio pipeline.")
+    parser.add_argument("--format", default="ndjson", choices=["json", "csv", "ndjson"])
+    parser.add_argument("--config", default=None, help="Base scraper config; the benchmark overrides base_url and output.")
+    parser.add_argument("--json", dest="json_out", default=None, help="Also write the results to this JSON file.")
+    add_fixture_arguments(parser)
+    args = parser.parse_args()
+
+    fixture = fixture_config_from_args(args)
+    proc, base_url = start_fixture_server(fixture)
+    try:
+        with tempfile.TemporaryDirectory(prefix="yp-bench-") as tmp:
+            config = runner.load_config(args.config)
+            config["base_url"] = base_url
+            config["max_results"] = fixture.listings
+            config["output"] = config["output"] | {"directory": tmp, "format": args.format}
+            config_path = Path(tmp) / "bench_config.json"
+            config_path.write_text(json.dumps(config), encoding="utf-8")
+
+            scraper_args = ["--keyword", "bench", "--location", "Town, CA", "--config", str(config_path)]
+            scraper_args += ["--workers", str(args.workers)]
+            if args.pipeline:
+                scraper_args.append("--pipeline")
+
+            latencies: List[float] = []
+            runner.make_enricher = timed_make_enricher(latencies)
+            started = time.perf_counter()
+            runner.run_scraper(runner.build_arg_parser().parse_args(scraper_args))
+            elapsed = time.perf_counter() - started
+        stats = fetch_stats(base_url)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [latencies[0]] * 99
+    results = {
+        "mode": "pipeline" if args.pipeline else "sequential search + threaded enrich",
+        "workers": args.workers,
+        "elapsed_s": round(elapsed, 3),
+        "records": len(latencies),
+        "search_pages": stats.get("search", 0),
+        "site_pages": stats.get("site", 0),
+        "site_errors": stats.get("site_error", 0),
+        "pages_per_s": round((stats.get("search", 0) + stats.get("site", 0)) / elapsed, 1),
+        "records_per_s": round(len(latencies) / elapsed, 1),
+        "latency_p50_ms": round(cuts[49] * 1000, 1),
+        "latency_p95_ms": round(cuts[94] * 1000, 1),
+        "latency_p99_ms": round(cuts[98] * 1000, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    width = max(len(key) for key in results)
+    for key, value in results.items():
+        print(f"{key:<{width}}  {value}")
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results | {"fixture": vars(fixture)}, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark per-record memory and merge cost of the record model.
+
+Builds N enriched records two ways: the previous plain-dict shape (listing
+dict merged with a fresh contact dict of "Not Found" lists via
+``record | contact``) and the slotted Listing / ContactInfo / BusinessRecord
+model, where records sharing a website share one immutable ContactInfo.
+Memory is measured with tracemalloc; strings read from the page are counted
+in both cases.
+
+Usage:
+    python benchmarks/bench_records.py [--records 100000] [--sites 20000]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from records import NO_CONTACT, NOT_FOUND, SOCIAL_PLATFORMS, BusinessRecord, ContactInfo, Listing  # type: ignore
+
+def listing_fields(i: int, sites: int) -> Tuple[str, ...]:
+    website = f"https://www.business{i % sites}.example/" if i % 7 else ""
+    return (
+        f"Business {i}",
+        f"{i} Main St, Town, CA 90000",
+        f"(555) 555-{i % 10000:04d}",
+        website,
+        f"https://www.yellowpages.com/town-ca/mip/business-{i}",
+    )
+
+def contact_found(site: int) -> Tuple[List[str], Dict[str, List[str]]]:
+    emails = [f"info@business{site}.example"]
+    social = {"facebook": [f"https://www.facebook.com/business{site}"]} if site % 2 else {}
+    return emails, social
+
+def build_dicts(count: int, sites: int) -> List[Dict[str, Any]]:
+    records = []
+    for i in range(count):
+        name, address, phone, website, url = listing_fields(i, sites)
+        listing = {
+            "name": name,
+            "address": address,
+            "phone": phone,
+            "website": website or NOT_FOUND,
+            "listing_url": url,
+        }
+        if website:
+            emails, social = contact_found(i % sites)
+        else:
+            emails, social = [], {}
+        contact = {
+            "emails": list(emails) or [NOT_FOUND],
+            "socialmedia": {p: list(social.get(p, [])) or [NOT_FOUND] for p in SOCIAL_PLATFORMS},
+        }
+        records.append(listing | contact)
+    return records
+
+def build_records(count: int, sites: int) -> List[BusinessRecord]:
+    scans: Dict[int, ContactInfo] = {}
+    records = []
+    for i in range(count):
+        name, address, phone, website, url = listing_fields(i, sites)
+        listing = Listing(name, address, phone, website or None, url)
+        if website:
+            site = i % sites
+            contact = scans.get(site)
+            if contact is None:
+                contact = scans[site] = ContactInfo.from_found(*contact_found(site))
+        else:
+            contact = NO_CONTACT
+        records.append(BusinessRecord(listing, contact))
+    return records
+
+def measure(build: Callable[[int, int], List[Any]], count: int, sites: int) -> Tuple[float, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    records = build(count, sites)
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return current / count, elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--sites", type=int, default=20_000, help="Distinct websites the records point at.")
+    args = parser.parse_args()
+
+    # Both shapes must export the same thing.
+    assert build_dicts(50, 10) == [record.to_dict() for record in build_records(50, 10)]
+
+    dict_bytes, dict_s = measure(build_dicts, args.records, args.sites)
+    slot_bytes, slot_s = measure(build_records, args.records, args.sites)
+    print(f"{args.records} records over {args.sites} websites")
+    print(f"  dict records:    {dict_bytes:8.0f} B/record  build {dict_s:6.2f}s")
+    print(f"  slotted records: {slot_bytes:8.0f} B/record  build {slot_s:6.2f}s")
+    print(f"  memory saved:    {1 - slot_bytes / dict_bytes:8.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Local HTTP fixture server that mimics Yellow Pages search results and the
+business websites they link to, for offline benchmarks.
+
+``/search`` serves paginated results in the div.result / div.v-card markup the
+scraper parses. Each listing links to one of ``sites`` fake business sites,
+each bound to its own loopback address (127.1.x.y) so that sites count as
+different domains. A site has a homepage linking to contact and about pages;
+the contact page carries an email and a social link. Latency, error rate and
+oversized homepages are configurable. ``/stats`` on the search host returns
+request counters as JSON.
+
+Binding the extra loopback addresses works out of the box on Linux.
+
+Usage:
+    python benchmarks/fixture_server.py [--port 8765] [--listings 300] [--site-latency 0.1]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+SEARCH_HOST = "127.0.0.1"
+
+@dataclass
+class FixtureConfig:
+    listings: int = 300
+    per_page: int = 30
+    sites: int = 50
+    no_website_every: int = 7  # every Nth listing has no website link; 0 = all have one
+    search_latency: float = 0.05
+    site_latency: float = 0.1
+    jitter: float = 0.5  # latency varies by +/- this fraction
+    error_rate: float = 0.02  # share of site pages answering 500
+    large_rate: float = 0.02  # share of sites with an oversized homepage
+    large_kb: int = 4096
+    seed: int = 0
+
+def site_host(index: int) -> str:
+    return f"127.1.{index // 250}.{index % 250 + 1}"
+
+class _Stats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    def add(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+class FixtureServer:
+    """
+    Runs the search host and every business site host on background threads.
+
+    Use as a context manager, or call ``start()`` / ``stop()``.
+    """
+
+    def __init__(self, config: Optional[FixtureConfig] = None, port: int = 0) -> None:
+        self.config = config or FixtureConfig()
+        self.stats = _Stats()
+        self._servers: List[ThreadingHTTPServer] = []
+        self._threads: List[threading.Thread] = []
+        self._requested_port = port
+        self.port = port
+        rng = random.Random(self.config.seed)
+        self._large_sites = {i for i in range(self.config.sites) if rng.random() < self.config.large_rate}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{SEARCH_HOST}:{self.port}"
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                server._handle(self)
+
+        return Handler
+
+    def _serve(self, host: str, port: int) -> ThreadingHTTPServer:
+        httpd = ThreadingHTTPServer((host, port), self._handler())
+        httpd.daemon_threads = True
+        thread = threading.Thread(target=httpd.serve_forever, name=f"fixture-{host}", daemon=True)
+        thread.start()
+        self._servers.append(httpd)
+        self._threads.append(thread)
+        return httpd
+
+    def start(self) -> "FixtureServer":
+        search = self._serve(SEARCH_HOST, self._requested_port)
+        self.port = search.server_address[1]
+        for index in range(self.config.sites):
+            self._serve(site_host(index), self.port)
+        return self
+
+    def stop(self) -> None:
+        for httpd in self._servers:
+            httpd.shutdown()
+            httpd.server_close()
+        self._servers.clear()
+        self._threads.clear()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def _sleep(self, latency: float) -> None:
+        if latency > 0:
+            spread = self.config.jitter * latency
+            time.sleep(max(0.0, latency + random.uniform(-spread, spread)))
+
+    def _send(self, handler: BaseHTTPRequestHandler, body: str, status: int = 200) -> None:
+        payload = body.encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "text/html; charset=utf-8")
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+        self.stats.add("bytes", len(payload))
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        url = urlparse(handler.path)
+        host = handler.server.server_address[0]
+        if host == SEARCH_HOST:
+            if url.path == "/search":
+                self.stats.add("search")
+                self._sleep(self.config.search_latency)
+                page = int(parse_qs(url.query).get("page", ["1"])[0])
+                self._send(handler, self.search_page(page))
+            elif url.path == "/stats":
+                self._send(handler, json.dumps(self.stats.snapshot()))
+            else:
+                self._send(handler, "<html><body>Not found</body></html>", status=404)
+            return
+
+        _, _, block, last = host.split(".")
+        index = int(block) * 250 + int(last) - 1
+        self.stats.add("site")
+        self._sleep(self.config.site_latency)
+        if random.Random(f"{self.config.seed}:{host}:{url.path}").random() < self.config.error_rate:
+            self.stats.add("site_error")
+            self._send(handler, "<html><body>Internal Server Error</body></html>", status=500)
+        elif url.path in ("", "/"):
+            self._send(handler, self.homepage(index))
+        elif url.path == "/contact-us/":
+            self._send(handler, self.contact_page(index))
+        elif url.path == "/about/":
+            self._send(handler, self.about_page(index))
+        else:
+            self._send(handler, "<html><body>Not found</body></html>", status=404)
+
+    def search_page(self, page: int) -> str:
+        cfg = self.config
+        first = (page - 1) * cfg.per_page
+        last = min(page * cfg.per_page, cfg.listings)
+        cards = [self.search_card(i) for i in range(first, last)]
+        next_link = (
+            f'<a class="next ajax-page" href="/search?page={page + 1}" data-page="{page + 1}">Next</a>'
+            if last < cfg.listings
+            else ""
+        )
+        return (
+            "<!DOCTYPE html>\n<html lang=\"en\"><head><meta charset=\"utf-8\"><title>Search results</title></head>\n"
+            "<body><div id=\"main-content\"><div class=\"search-results organic\">"
+            f"<div class=\"pagination\"><span class=\"showing-count\">Showing {first + 1}-{last} of {cfg.listings}</span></div>\n"
+            + "\n".join(cards)
+            + f"\n<div class=\"pagination\">{next_link}</div></div></div></body></html>\n"
+        )
+
+    def search_card(self, i: int) -> str:
+        cfg = self.config
+        slug = f"business-{i}-{1000 + i}"
+        website = ""
+        if not cfg.no_website_every or i % cfg.no_website_every:
+            website = (
+                f'<a class="track-visit-website" href="http://{site_host(i % cfg.sites)}:{self.port}/" '
+                'rel="nofollow noopener" target="_blank">Website</a>'
+            )
+        return (
+            f'<div class="result" id="lid-{i}">\n'
+            '  <div class="srp-listing clickable-area mdm">\n'
+            '    <div class="v-card">\n'
+            '      <div class="info">\n'
+            '        <div class="info-section info-primary">\n'
+            f'          <h2 class="n">{i + 1}.<a class="business-name" href="/town-ca/mip/{slug}"><span>Business {i}</span></a></h2>\n'
+            '          <div class="categories"><a href="/town-ca/services">Services</a></div>\n'
+            '        </div>\n'
+            '        <div class="info-section info-secondary">\n'
+            f'          <div class="phones phone primary">(555) 555-{i % 10000:04d}</div>\n'
+            f'          <div class="adr"><div class="street-address">{i + 1} Main St</div><div class="locality">Town, CA 90000</div></div>\n'
+            '        </div>\n'
+            f'        <div class="links">{website}<a class="more-info" href="/town-ca/mip/{slug}">More Info</a></div>\n'
+            '      </div>\n'
+            '    </div>\n'
+            '  </div>\n'
+            '</div>'
+        )
+
+    def homepage(self, index: int) -> str:
+        filler = ""
+        if index in self._large_sites:
+            paragraph = "<p>" + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 16 + "</p>\n"
+            filler = paragraph * (self.config.large_kb * 1024 // len(paragraph) + 1)
+        return (
+            f"<!DOCTYPE html>\n<html><head><title>Business {index}</title></head><body>\n"
+            '<nav><a href="/">Home</a> <a href="/services/">Services</a> '
+            '<a href="/about/">About Us</a> <a href="/contact-us/">Contact</a></nav>\n'
+            f"<main><h1>Business {index}</h1><p>Family owned and operated since {1950 + index % 70}.</p>\n{filler}</main>\n"
+            f'<footer><a href="https://www.facebook.com/business{index}">Facebook</a></footer>\n'
+            "</body></html>\n"
+        )
+
+    def contact_page(self, index: int) -> str:
+        return (
+            f"<!DOCTYPE html>\n<html><head><title>Contact Business {index}</title></head><body>\n"
+            f"<p>Email us at info@business{index}.example or call (555) 555-{index % 10000:04d}.</p>\n"
+            f'<p><a href="https://www.instagram.com/business{index}/">Instagram</a></p>\n'
+            "</body></html>\n"
+        )
+
+    def about_page(self, index: int) -> str:
+        return (
+            f"<!DOCTYPE html>\n<html><head><title>About Business {index}</title></head><body>\n"
+            "<p>We have proudly served the community for decades.</p>\n"
+            f'<p><a href="https://www.linkedin.com/company/business{index}">LinkedIn</a></p>\n'
+            "</body></html>\n"
+        )
+
+def add_fixture_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = FixtureConfig()
+    for name, value in asdict(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+
+def fixture_config_from_args(args: argparse.Namespace) -> FixtureConfig:
+    return FixtureConfig(**{name: getattr(args, name) for name in asdict(FixtureConfig())})
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    add_fixture_arguments(parser)
+    args = parser.parse_args()
+
+    with FixtureServer(fixture_config_from_args(args), port=args.port) as server:
+        print(f"Serving search results at {server.base_url}/search ({server.config.sites} sites). Ctrl-C to stop.", flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
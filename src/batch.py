@@ -0,0 +1,98 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from extractors.yellowpages_parser import YellowPagesScraper  # type: ignore
+from records import BusinessRecord, Listing  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class SearchQuery:
+    keyword: str
+    location: str
+
+    @property
+    def slug(self) -> str:
+        return re.sub(r"[^a-z0-9]+", "_", f"{self.keyword} {self.location}".lower()).strip("_")
+
+def load_queries(path: str | Path) -> List[SearchQuery]:
+    """
+    Read "keyword, location" lines from a batch input file.
+
+    The keyword is everything before the first comma, so locations such as
+    "Los Angeles, CA" keep their own commas. Blank lines and lines starting
+    with '#' are ignored, as are exact duplicate queries.
+    """
+    queries: List[SearchQuery] = []
+    seen = set()
+    with Path(path).open("r", encoding="utf-8") as f:
+        for line_no, raw_line in enumerate(f, start=1):
+            line = raw_line.strip()
+            if not line or line.startswith("#"):
+                continue
+            keyword, sep, location = line.partition(",")
+            keyword, location = keyword.strip(), location.strip()
+            if not sep or not keyword or not location:
+                logger.warning("Skipping malformed line %d in '%s': %r", line_no, path, line)
+                continue
+            query = SearchQuery(keyword=keyword, location=location)
+            if query not in seen:
+                seen.add(query)
+                queries.append(query)
+    return queries
+
+def run_batch(
+    queries: List[SearchQuery],
+    scraper: YellowPagesScraper,
+    enrich: Callable[[List[Listing]], List[BusinessRecord]],
+    max_results: int = 50,
+    sort: str = "bestmatch",
+    concurrency: int = 4,
+) -> Tuple[List[BusinessRecord], Dict[SearchQuery, List[BusinessRecord]]]:
+    """
+    Run every query's search concurrently, then enrich the deduplicated listings once.
+
+    Request politeness towards each host is enforced by the shared HttpClient
+    behind ``scraper`` and ``enrich``; ``concurrency`` limits how many queries
+    paginate at the same time.
+
+    :return: The combined, deduplicated records in first-seen order and the
+        records belonging to each query.
+    """
+
+    def search(query: SearchQuery) -> List[Listing]:
+        logger.info("Searching keyword='%s', location='%s'.", query.keyword, query.location)
+        return scraper.search(
+            keyword=query.keyword,
+            location=query.location,
+            max_results=max_results,
+            sort=sort,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch") as executor:
+        per_query_listings = dict(zip(queries, executor.map(search, queries)))
+
+    unique: Dict[Tuple[str, ...], Listing] = {}
+    for listings in per_query_listings.values():
+        for listing in listings:
+            unique.setdefault(listing.key(), listing)
+
+    total = sum(len(listings) for listings in per_query_listings.values())
+    logger.info(
+        "Batch search found %d listings across %d queries (%d unique). Enriching unique listings…",
+        total,
+        len(queries),
+        len(unique),
+    )
+
+    combined = enrich(list(unique.values()))
+    enriched_by_key = {record.key(): record for record in combined}
+    per_query = {
+        query: [enriched_by_key[listing.key()] for listing in listings]
+        for query, listings in per_query_listings.items()
+    }
+    return combined, per_query
@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from extractors.yellowpages_parser import YellowPagesScraper  # type: ignore
+from records import BusinessRecord, Listing  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+class CheckpointJournal:
+    """
+    Append-only NDJSON journal of a single-query scrape.
+
+    Every completed search page and every enriched listing is appended as one
+    line, so an interrupted run can be resumed: finished pages are replayed
+    from the journal, pagination continues from the next page, and listings
+    that were already enriched are not scanned again. The journal starts with
+    the query it belongs to and is only resumed for the same query.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        run: Dict[str, Any],
+        resume: bool = False,
+        fsync_interval: float = 1.0,
+    ) -> None:
+        self.path = Path(path)
+        self.run = run
+        self.fsync_interval = fsync_interval
+        self.pages: List[List[Listing]] = []
+        self.search_complete = False
+        self.records: Dict[str, BusinessRecord] = {}
+        self._lock = threading.Lock()
+        self._last_sync = time.monotonic()
+
+        if resume and self.path.is_file() and self._load():
+            logger.info(
+                "Resuming from checkpoint '%s': %d page(s), %d enriched listing(s)%s.",
+                self.path,
+                len(self.pages),
+                len(self.records),
+                ", search complete" if self.search_complete else "",
+            )
+            self._file = self.path.open("a", encoding="utf-8")
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("w", encoding="utf-8")
+            self._append({"type": "run", "run": run})
+
+    def _load(self) -> bool:
+        with self.path.open("r", encoding="utf-8") as f:
+            lines = f.readlines()
+
+        for line_no, line in enumerate(lines, start=1):
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a partially written last line behind.
+                logger.warning("Ignoring unreadable line %d in checkpoint '%s'.", line_no, self.path)
+                continue
+
+            kind = entry.get("type")
+            if kind == "run":
+                if entry.get("run") != self.run:
+                    logger.warning(
+                        "Checkpoint '%s' belongs to a different run (%s); starting over.",
+                        self.path,
+                        entry.get("run"),
+                    )
+                    return False
+            elif kind == "page":
+                self.pages.append([Listing.from_dict(listing) for listing in entry["listings"]])
+            elif kind == "search_complete":
+                self.search_complete = True
+            elif kind == "record":
+                self.records[entry["key"]] = BusinessRecord.from_dict(entry["record"])
+        return True
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False))
+            self._file.write("\n")
+            self._file.flush()
+            if time.monotonic() - self._last_sync >= self.fsync_interval:
+                os.fsync(self._file.fileno())
+                self._last_sync = time.monotonic()
+
+    def iter_pages(
+        self,
+        scraper: YellowPagesScraper,
+        keyword: str,
+        location: str,
+        max_results: int = 50,
+        sort: str = "bestmatch",
+    ) -> Iterator[List[Listing]]:
+        """
+        Replay journaled search pages, then continue pagination after the last one.
+        """
+        yield from self.pages
+        if self.search_complete:
+            return
+
+        page = len(self.pages)
+        collected = sum(len(listings) for listings in self.pages)
+        # Listings can repeat across pages; those already journaled are not yielded again.
+        seen = {listing.key() for listings in self.pages for listing in listings}
+        # Pages fetched from here on are only journaled, not kept in memory.
+        self.pages = []
+        for page_results in scraper.iter_search_pages(
+            keyword,
+            location,
+            max_results,
+            sort,
+            start_page=page + 1,
+            collected=collected,
+            seen=seen,
+        ):
+            page += 1
+            self._append(
+                {"type": "page", "page": page, "listings": [listing.to_dict() for listing in page_results]}
+            )
+            yield page_results
+
+        self._append({"type": "search_complete"})
+        self.search_complete = True
+
+    def enriched(self, listing: Listing) -> Optional[BusinessRecord]:
+        return self.records.get(listing.key_string())
+
+    def record_enriched(self, record: BusinessRecord) -> None:
+        self._append({"type": "record", "key": record.key_string(), "record": record.to_dict()})
+
+    def close(self, completed: bool = False) -> None:
+        """
+        Close the journal. A completed run has nothing left to resume, so its
+        journal is removed.
+        """
+        with self._lock:
+            self._file.close()
+        if completed:
+            self.path.unlink(missing_ok=True)
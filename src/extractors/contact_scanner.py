@@ -1,29 +1,52 @@
-thonimport logging
-import re
+import logging
+import threading
+import time
 from collections import defaultdict
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Set
-from urllib.parse import urljoin, urlparse
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
 import requests
-from bs4 import BeautifulSoup, Tag
+
+from extractors.fast_extract import extract_page
+from extractors.host_cache import HostUnavailable
+from extractors.http_client import HTML_CONTENT_TYPES, FetchResponse, HttpClient
+from extractors.parse_pool import ParsePool
+from extractors.scan_store import ScanStore
+from metrics import counter, histogram  # type: ignore
+from records import NO_CONTACT, PARTIAL, ContactInfo  # type: ignore
 
 logger = logging.getLogger(__name__)
 
-EMAIL_REGEX = re.compile(
-    r"[a-zA-Z0-9.!#$%&'*+/=?^_`{|}~-]+@"
-    r"[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?"
-    r"(?:\.[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)+"
-)
-
-SOCIAL_DOMAINS = {
-    "linkedin": ["linkedin.com"],
-    "facebook": ["facebook.com", "fb.com"],
-    "twitter": ["twitter.com", "x.com"],
-    "tiktok": ["tiktok.com"],
-    "pinterest": ["pinterest.com"],
-    "instagram": ["instagram.com"],
-}
+PARSE_SECONDS = histogram("parse_seconds", "Time to parse one page, by kind (search or website).")
+SCAN_SECONDS = histogram("scan_website_seconds", "Time to crawl one website: homepage plus follow-up pages.")
+PAGES_PER_SITE = histogram("scan_pages_per_site", "Pages fetched per crawled website.", buckets=(0, 1, 2, 3, 4, 6, 8, 16))
+SCAN_REUSED = counter("scan_reused_total", "Website scans answered without crawling, by source (memo or store).")
+
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "yclid", "dclid", "mc_cid", "mc_eid", "y_source", "_ga"}
+
+def clean_website_url(url: str) -> str:
+    """
+    Normalize a listing's website URL before scanning: add a missing scheme,
+    lowercase the host, drop tracking parameters (utm_*, gclid, ...), the
+    fragment and any trailing slash on the path.
+    """
+    url = url.strip()
+    parsed = urlparse(url if "://" in url else f"http://{url}")
+    query = urlencode(
+        [
+            (key, value)
+            for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+            if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+        ]
+    )
+    path = parsed.path.rstrip("/") or "/"
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), path, "", query, ""))
+
+def website_domain(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
 
 @dataclass
 class ContactScanner:
@@ -31,134 +54,246 @@ class ContactScanner:
     headers: Optional[Dict[str, str]] = None
     proxy: Optional[str] = None
     max_pages_per_site: int = 4
+    client: Optional[HttpClient] = None
+    memoize: bool = True
+    store: Optional[ScanStore] = None
+    page_workers: int = 8
+    site_deadline: float = 0.0
+    early_stop_platforms: Optional[List[str]] = None
+    max_page_bytes: int = 2 * 1024 * 1024
+    html_only: bool = True
+    parse_pool: Optional[ParsePool] = None
+    _memo: Dict[str, Future] = field(default_factory=dict, init=False, repr=False)
+    _memo_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _page_pool: Optional[ThreadPoolExecutor] = field(default=None, init=False, repr=False)
+    _page_pool_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
 
-    def _request(self, url: str) -> Optional[str]:
-        if not url or url == "Not Found":
+    def __post_init__(self) -> None:
+        if self.client is None:
+            self.client = HttpClient(headers=self.headers, proxy=self.proxy, timeout=self.timeout)
+
+    def _request(self, url: str, timeout: Optional[float] = None, retry: bool = True) -> Optional[FetchResponse]:
+        if not url:
             return None
 
-        proxies = {"http": self.proxy, "https": self.proxy} if self.proxy else None
         try:
             logger.debug("Requesting website URL for scanning: %s", url)
-            resp = requests.get(
+            return self.client.get(
                 url,
-                headers=self.headers,
-                timeout=self.timeout,
-                proxies=proxies,
+                timeout=timeout or self.timeout,
+                retry=retry,
+                source="website",
+                max_bytes=self.max_page_bytes,
+                content_types=HTML_CONTENT_TYPES if self.html_only else None,
             )
-            resp.raise_for_status()
-            return resp.text
+        except HostUnavailable as exc:
+            logger.debug("%s", exc)
+            return None
         except requests.RequestException as exc:
             logger.warning("Failed to fetch '%s' for contact scanning: %s", url, exc)
             return None
 
-    def _extract_emails_from_text(self, text: str) -> Set[str]:
-        emails = set(match.group(0) for match in EMAIL_REGEX.finditer(text))
-        logger.debug("Extracted %d email(s) from text.", len(emails))
-        return emails
-
-    def _extract_social_links_from_soup(self, soup: BeautifulSoup, base_url: str) -> Dict[str, Set[str]]:
-        found: Dict[str, Set[str]] = defaultdict(set)
-
-        for a in soup.find_all("a", href=True):
-            href = a["href"].strip()
-            if href.startswith("#") or not href:
-                continue
-
-            full_url = urljoin(base_url, href)
-            domain = urlparse(full_url).netloc.lower()
-
-            for platform, domains in SOCIAL_DOMAINS.items():
-                if any(d in domain for d in domains):
-                    found[platform].add(full_url)
-
-        for platform in SOCIAL_DOMAINS.keys():
-            logger.debug("Found %d %s link(s).", len(found.get(platform, set())), platform)
-        return found
-
-    def _discover_internal_links(self, soup: BeautifulSoup, base_url: str) -> Set[str]:
-        candidates: Set[str] = set()
-        keywords = ["contact", "about", "impressum", "reach-us", "support"]
-        for a in soup.find_all("a", href=True):
-            href = a["href"].lower()
-            if any(kw in href for kw in keywords):
-                full_url = urljoin(base_url, a["href"])
-                candidates.add(full_url)
-        logger.debug("Discovered %d potential internal contact/about links.", len(candidates))
-        return candidates
-
-    def _scan_single_page(self, url: str) -> Dict[str, any]:
-        html = self._request(url)
-        if not html:
+    def _scan_single_page(self, url: str, timeout: Optional[float] = None, retry: bool = True) -> Dict[str, Any]:
+        resp = self._request(url, timeout=timeout, retry=retry)
+        if resp is None or not resp.content:
             return {"emails": set(), "social": defaultdict(set)}
 
-        soup = BeautifulSoup(html, "lxml")
-        text = soup.get_text(" ", strip=True)
+        with PARSE_SECONDS.time(kind="website"):
+            if self.parse_pool is not None:
+                page = self.parse_pool.run(extract_page, resp.content, url, resp.encoding)
+            else:
+                page = extract_page(resp.content, url, encoding=resp.encoding)
+        logger.debug(
+            "Extracted %d email(s), %d social platform(s) and %d contact link(s) from %s.",
+            len(page.emails),
+            len(page.social),
+            len(page.contact_links),
+            url,
+        )
+        return {"emails": page.emails, "social": page.social, "links": page.contact_links}
 
-        emails = self._extract_emails_from_text(text)
-        social = self._extract_social_links_from_soup(soup, url)
+    def scan_website(self, website_url: Optional[str], deadline: Optional[float] = None) -> ContactInfo:
+        """
+        Scan given website URL for email addresses and social media profile links.
 
-        return {"emails": emails, "social": social, "soup": soup}
+        :param deadline: ``time.monotonic()`` value by which the scan must end,
+            on top of ``site_deadline``. A crawl cut short by either returns
+            what it found so far, marked ``PARTIAL``.
 
-    def scan_website(self, website_url: str) -> Dict[str, List[str]]:
+        Results are memoized per normalized domain for the lifetime of the
+        scanner, so listings that share a website (chains, franchises) are
+        scanned once, and concurrent callers for the same domain wait on the
+        scan already in flight. With a ``store`` attached, results are also
+        reused across runs until they expire. Results are immutable, so every
+        listing of a domain shares the same ``ContactInfo``.
         """
-        Scan given website URL for email addresses and social media profile links.
+        if not website_url:
+            logger.info("No website URL provided, using empty contact data.")
+            return NO_CONTACT
+
+        url = clean_website_url(website_url)
+        domain = website_domain(url)
+        if not self.memoize or not domain:
+            return self._scan_domain(domain, url, deadline)
+
+        with self._memo_lock:
+            future = self._memo.get(domain)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._memo[domain] = future
+
+        if not owner:
+            logger.debug("Reusing contact scan of '%s' for '%s'.", domain, website_url)
+            SCAN_REUSED.inc(source="memo")
+            return future.result()
+
+        try:
+            result = self._scan_domain(domain, url, deadline)
+        except BaseException as exc:
+            with self._memo_lock:
+                self._memo.pop(domain, None)
+            future.set_exception(exc)
+            raise
+        future.set_result(result)
+        return result
+
+    def estimate_cost(self, website_url: str) -> float:
         """
-        if not website_url or website_url == "Not Found":
-            logger.info("No website URL provided, using Not Found defaults for contact data.")
-            return {
-                "emails": ["Not Found"],
-                "socialmedia": {platform: ["Not Found"] for platform in SOCIAL_DOMAINS.keys()},
-            }
+        Rough seconds a scan of ``website_url`` will take, for scheduling:
+        0 when it can be answered without crawling (memo, store or a host
+        known to be dead), else two of the host's recent page fetch times
+        (the homepage, then the follow-up pages fetched side by side), or the
+        request timeout for hosts not seen yet.
+        """
+        url = clean_website_url(website_url)
+        domain = website_domain(url)
+        if domain and self.memoize and domain in self._memo:
+            return 0.0
+        host = urlparse(url).netloc
+        if self.client.dead_hosts is not None and self.client.dead_hosts.check(host) is not None:
+            return 0.0
+        if self.store is not None and domain and self.store.get(domain) is not None:
+            return 0.0
+        latency = self.client.host_latency(host)
+        if latency is None:
+            return float(self.timeout)
+        return latency * min(2, self.max_pages_per_site)
 
-        visited: Set[str] = set()
-        to_visit: List[str] = [website_url]
+    def _scan_domain(self, domain: str, url: str, deadline: Optional[float] = None) -> ContactInfo:
+        if self.store is not None and domain:
+            stored = self.store.get(domain)
+            if stored is not None:
+                logger.debug("Using stored contact scan for '%s'.", domain)
+                SCAN_REUSED.inc(source="store")
+                return stored
 
-        all_emails: Set[str] = set()
-        all_social: Dict[str, Set[str]] = defaultdict(set)
+        with SCAN_SECONDS.time():
+            result, pages_fetched = self._crawl(url, deadline)
+        PAGES_PER_SITE.observe(pages_fetched)
+        # Don't persist failed or cut-short crawls; a site that is down today may be back tomorrow.
+        if self.store is not None and domain and pages_fetched and result.status is None:
+            self.store.put(domain, result)
+        return result
+
+    def _pages(self) -> ThreadPoolExecutor:
+        # Shared by every site this scanner crawls; created on first use so a
+        # scanner that never follows links doesn't start any threads.
+        with self._page_pool_lock:
+            if self._page_pool is None:
+                self._page_pool = ThreadPoolExecutor(
+                    max_workers=max(1, self.page_workers),
+                    thread_name_prefix="scan-page",
+                )
+            return self._page_pool
 
-        pages_scanned = 0
+    def _has_enough(self, emails: Set[str], social: Dict[str, Set[str]]) -> bool:
+        if self.early_stop_platforms is None or not emails:
+            return False
+        return all(social.get(platform) for platform in self.early_stop_platforms)
 
-        while to_visit and pages_scanned < self.max_pages_per_site:
-            current_url = to_visit.pop(0)
-            if current_url in visited:
-                continue
+    def _crawl(self, website_url: str, deadline: Optional[float] = None) -> Tuple[ContactInfo, int]:
+        """
+        Scan the homepage, then fetch the discovered contact/about pages concurrently.
+
+        The crawl stops early once an email and every platform in
+        ``early_stop_platforms`` have been found, and never runs past
+        ``site_deadline`` seconds (0 disables the deadline) or ``deadline``.
+        """
+        if self.site_deadline > 0:
+            site_deadline = time.monotonic() + self.site_deadline
+            deadline = site_deadline if deadline is None else min(deadline, site_deadline)
 
-            visited.add(current_url)
-            logger.debug("Scanning page %s (%d/%d)", current_url, pages_scanned + 1, self.max_pages_per_site)
+        def remaining() -> Optional[float]:
+            return None if deadline is None else deadline - time.monotonic()
 
-            result = self._scan_single_page(current_url)
-            pages_scanned += 1
+        def request_timeout() -> float:
+            left = remaining()
+            return self.timeout if left is None else max(0.1, min(self.timeout, left))
 
+        all_emails: Set[str] = set()
+        all_social: Dict[str, Set[str]] = defaultdict(set)
+        pages_fetched = 0
+
+        def merge(result: Dict[str, Any]) -> None:
+            nonlocal pages_fetched
+            if "links" in result:
+                pages_fetched += 1
             all_emails.update(result["emails"])
             for platform, links in result["social"].items():
                 all_social[platform].update(links)
 
-            # Discover additional internal contact/about pages from the first page
-            if pages_scanned == 1 and isinstance(result.get("soup"), Tag | BeautifulSoup):
-                soup = result["soup"]
-                more_links = self._discover_internal_links(soup, current_url)
-                for link in more_links:
-                    if link not in visited:
-                        to_visit.append(link)
+        logger.debug("Scanning page %s (1/%d)", website_url, self.max_pages_per_site)
+        # Under a deadline a failed page is not retried; the retries' backoff would overrun it.
+        retry = deadline is None
+        homepage = self._scan_single_page(website_url, timeout=request_timeout(), retry=retry)
+        merge(homepage)
+        left = remaining()
+        # A homepage that failed once the deadline was (nearly) up most likely
+        # ran out of time rather than being down.
+        cut_short = "links" not in homepage and left is not None and left <= 0.1
 
-        if not all_emails:
-            emails_out = ["Not Found"]
-        else:
-            emails_out = sorted(all_emails)
+        # Discover additional internal contact/about pages from the first page
+        follow_ups: List[str] = []
+        if "links" in homepage:
+            more_links = set(homepage["links"])
+            more_links.discard(website_url)
+            follow_ups = sorted(more_links)[: max(0, self.max_pages_per_site - 1)]
 
-        social_out: Dict[str, List[str]] = {}
-        for platform in SOCIAL_DOMAINS.keys():
-            links = sorted(all_social.get(platform, []))
-            social_out[platform] = links if links else ["Not Found"]
+        if follow_ups and not self._has_enough(all_emails, all_social):
+            pending = {
+                self._pages().submit(self._scan_single_page, link, request_timeout(), retry): link
+                for link in follow_ups
+            }
+            while pending:
+                left = remaining()
+                if left is not None and left <= 0:
+                    logger.info("Site deadline reached for '%s'; skipping %d page(s).", website_url, len(pending))
+                    cut_short = True
+                    break
+                done, _ = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.pop(future)
+                    merge(future.result())
+                if self._has_enough(all_emails, all_social):
+                    logger.debug("Found required contact data for '%s'; stopping crawl early.", website_url)
+                    break
+            for future in pending:
+                future.cancel()
 
+        result = ContactInfo.from_found(all_emails, all_social, status=PARTIAL if cut_short else None)
         logger.info(
-            "Contact scan for '%s' complete. Emails=%d, social platforms=%d.",
+            "Contact scan for '%s' %s. Emails=%d, social platforms=%d.",
             website_url,
-            0 if emails_out == ["Not Found"] else len(emails_out),
-            len([p for p, v in social_out.items() if v != ["Not Found"]]),
+            "cut short" if cut_short else "complete",
+            len(result.emails),
+            result.platforms_found(),
         )
+        return result, pages_fetched
 
-        return {
-            "emails": emails_out,
-            "socialmedia": social_out,
-        }
\ No newline at end of file
+    def close(self) -> None:
+        """Stop the page pool and close the attached ``store``; the client is the caller's."""
+        if self._page_pool is not None:
+            self._page_pool.shutdown(wait=False, cancel_futures=True)
+        if self.store is not None:
+            self.store.close()
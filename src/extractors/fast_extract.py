@@ -0,0 +1,143 @@
+import html
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional, Set
+from urllib.parse import unquote, urljoin, urlparse
+
+EMAIL_REGEX = re.compile(
+    r"[a-zA-Z0-9.!#$%&'*+/=?^_`{|}~-]+@"
+    r"[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?"
+    r"(?:\.[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)+"
+)
+
+SOCIAL_DOMAINS = {
+    "linkedin": ["linkedin.com"],
+    "facebook": ["facebook.com", "fb.com"],
+    "twitter": ["twitter.com", "x.com"],
+    "tiktok": ["tiktok.com"],
+    "pinterest": ["pinterest.com"],
+    "instagram": ["instagram.com"],
+}
+# Registered domain -> platform. A host matches when it, or any parent domain
+# of it, is in the table (www.facebook.com, m.facebook.com, ...).
+SOCIAL_SUFFIXES = {domain: platform for platform, domains in SOCIAL_DOMAINS.items() for domain in domains}
+
+CONTACT_LINK_KEYWORDS = ("contact", "about", "impressum", "reach-us", "support")
+
+# One scan over the document: comments and non-rendered elements are skipped
+# whole, <a> start tags are captured for their href, other tags are skipped,
+# and whatever lies between matches is page text.
+_TOKEN_RE = re.compile(
+    rb"""
+    <!--.*?-->
+    | <(?:script|style|template)\b(?:[^>"']|"[^"]*"|'[^']*')*>.*?</(?:script|style|template)\s*>
+    | <a\s((?:[^>"']|"[^"]*"|'[^']*')*)>
+    | <[!/?a-zA-Z](?:[^>"']|"[^"]*"|'[^']*')*>
+    """,
+    re.S | re.I | re.X,
+)
+_HREF_RE = re.compile(rb"""(?:^|\s)href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.I)
+
+_LOCAL_CHARS = frozenset(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.!#$%&'*+/=?^_`{|}~-")
+_DOMAIN_RE = re.compile(
+    rb"[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?"
+    rb"(?:\.[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)+"
+)
+_MAX_LOCAL_PART = 64
+_ENCODED_AT_RE = re.compile(rb"&(?:#0*64|#x0*40|commat);", re.I)
+
+@dataclass
+class PageExtract:
+    emails: Set[str] = field(default_factory=set)
+    social: Dict[str, Set[str]] = field(default_factory=lambda: defaultdict(set))
+    contact_links: Set[str] = field(default_factory=set)
+
+def social_platform(host: str) -> Optional[str]:
+    """
+    Return the social platform ``host`` belongs to, checking the host and each
+    of its parent domains against ``SOCIAL_SUFFIXES``.
+    """
+    host = host.rpartition("@")[2].split(":", 1)[0].rstrip(".")
+    while "." in host:
+        platform = SOCIAL_SUFFIXES.get(host)
+        if platform is not None:
+            return platform
+        host = host.split(".", 1)[1]
+    return None
+
+def _iter_emails(text: bytes) -> Iterator[str]:
+    """
+    Find emails by locating each '@' and growing the match around it, so the
+    cost is proportional to the number of '@' signs rather than to how long
+    the runs of word characters are.
+    """
+    end = 0
+    at = text.find(b"@")
+    while at != -1:
+        start = at
+        floor = max(end, at - _MAX_LOCAL_PART)
+        while start > floor and text[start - 1] in _LOCAL_CHARS:
+            start -= 1
+        domain = _DOMAIN_RE.match(text, at + 1) if start < at else None
+        if domain is not None:
+            end = domain.end()
+            yield text[start:end].decode("ascii")
+        at = text.find(b"@", max(at + 1, end))
+
+def _text_emails(segment: bytes) -> Iterator[str]:
+    if b"&" in segment and _ENCODED_AT_RE.search(segment):
+        segment = html.unescape(segment.decode("utf-8", errors="replace")).encode("utf-8", errors="replace")
+    elif b"@" not in segment:
+        return iter(())
+    return _iter_emails(segment)
+
+def _mailto_emails(href: str) -> Iterator[str]:
+    address = unquote(href[len("mailto:") :].split("?", 1)[0])
+    for part in address.split(","):
+        match = EMAIL_REGEX.fullmatch(part.strip())
+        if match is not None:
+            yield match.group(0)
+
+def extract_page(content: bytes, base_url: str, encoding: Optional[str] = None) -> PageExtract:
+    """
+    Pull emails, social profile links and candidate contact/about pages out of
+    raw HTML in a single pass, without building a DOM.
+
+    Emails come from the page text (not from markup, scripts or comments) and
+    from ``mailto:`` links. Every ``<a href>`` is resolved against ``base_url``
+    once and then classified.
+    """
+    result = PageExtract()
+    pos = 0
+    for token in _TOKEN_RE.finditer(content):
+        if token.start() > pos:
+            result.emails.update(_text_emails(content[pos : token.start()]))
+        pos = token.end()
+
+        attrs = token.group(1)
+        if not attrs:
+            continue
+        href_match = _HREF_RE.search(attrs)
+        if href_match is None:
+            continue
+        raw_href = next(g for g in href_match.groups() if g is not None)
+        href = html.unescape(raw_href.decode(encoding or "utf-8", errors="replace")).strip()
+        if not href or href.startswith("#"):
+            continue
+
+        lowered = href.lower()
+        if lowered.startswith("mailto:"):
+            result.emails.update(_mailto_emails(href))
+            continue
+
+        full_url = urljoin(base_url, href)
+        platform = social_platform(urlparse(full_url).netloc.lower())
+        if platform is not None:
+            result.social[platform].add(full_url)
+        if any(keyword in lowered for keyword in CONTACT_LINK_KEYWORDS):
+            result.contact_links.add(full_url)
+
+    if pos < len(content):
+        result.emails.update(_text_emails(content[pos:]))
+    return result
@@ -0,0 +1,232 @@
+import errno
+import logging
+import re
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from urllib3.exceptions import TimeoutError as Urllib3Timeout
+
+from metrics import counter  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+DNS_LOOKUPS = counter("dns_cache_total", "Host name lookups by result (hit, negative_hit, miss).")
+DEAD_HOST_SKIPS = counter("dead_host_skips_total", "Requests skipped because their host was marked unreachable.")
+DEAD_HOSTS = counter("dead_hosts_total", "Hosts marked unreachable, by reason (dns, refused, bad_gateway or timeout).")
+
+# Resolver answers that mean "this name does not exist", as opposed to a
+# resolver that is briefly unavailable (EAI_AGAIN), which is not cached.
+NEGATIVE_DNS_ERRORS = tuple(
+    code for code in (getattr(socket, "EAI_NONAME", None), getattr(socket, "EAI_NODATA", None)) if code is not None
+)
+
+# urllib3 reports a refused CONNECT as a plain OSError with this message.
+TUNNEL_FAILED_RE = re.compile(r"Tunnel connection failed: (\d{3})")
+# CONNECT answers meaning the proxy could not reach or hear back from the target.
+TARGET_TUNNEL_STATUSES = (502, 504)
+
+class HostUnavailable(requests.ConnectionError):
+    """Raised instead of connecting to a host that recently proved unreachable."""
+
+@dataclass
+class DnsCache:
+    """
+    In-process cache in front of ``socket.getaddrinfo``.
+
+    Successful lookups are kept for ``ttl`` seconds and names that do not
+    exist for ``negative_ttl`` seconds, so retries and later requests to the
+    same host skip the resolver. ``install`` hooks the cache into the socket
+    module for the whole process (requests resolves through it); ``uninstall``
+    puts the previous resolver back.
+    """
+
+    ttl: float = 300.0
+    negative_ttl: float = 300.0
+    max_entries: int = 10_000
+    _entries: Dict[Tuple[Any, ...], Tuple[float, Any]] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _resolve: Callable[..., List[Any]] = field(default=socket.getaddrinfo, init=False, repr=False)
+    _installed: bool = field(default=False, init=False, repr=False)
+
+    def getaddrinfo(
+        self, host: Any, port: Any, family: int = 0, type: int = 0, proto: int = 0, flags: int = 0
+    ) -> List[Any]:
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            if isinstance(entry[1], socket.gaierror):
+                DNS_LOOKUPS.inc(result="negative_hit")
+                raise socket.gaierror(*entry[1].args)
+            DNS_LOOKUPS.inc(result="hit")
+            return list(entry[1])
+
+        DNS_LOOKUPS.inc(result="miss")
+        try:
+            result = self._resolve(host, port, family, type, proto, flags)
+        except socket.gaierror as exc:
+            if exc.errno in NEGATIVE_DNS_ERRORS and self.negative_ttl > 0:
+                self._store(key, now + self.negative_ttl, exc)
+            raise
+        if self.ttl > 0:
+            self._store(key, now + self.ttl, list(result))
+        return result
+
+    def _store(self, key: Tuple[Any, ...], expires: float, value: Any) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[key] = (expires, value)
+
+    def install(self) -> None:
+        if self._installed:
+            return
+        self._resolve = socket.getaddrinfo
+        socket.getaddrinfo = self.getaddrinfo  # type: ignore[assignment]
+        self._installed = True
+
+    def uninstall(self) -> None:
+        if not self._installed:
+            return
+        if socket.getaddrinfo == self.getaddrinfo:
+            socket.getaddrinfo = self._resolve  # type: ignore[assignment]
+        self._installed = False
+
+def _causes(exc: BaseException) -> Iterator[BaseException]:
+    # requests wraps the socket error a few levels deep (MaxRetryError,
+    # NewConnectionError, ...), via args, ``reason`` and exception chaining.
+    seen = set()
+    stack = [exc]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        yield current
+        nested = [getattr(current, "reason", None), current.__cause__, current.__context__]
+        nested.extend(arg for arg in current.args if isinstance(arg, BaseException))
+        stack.extend(item for item in nested if isinstance(item, BaseException))
+
+def tunnel_status(exc: BaseException) -> Optional[int]:
+    """Status a proxy answered a CONNECT with, when that is why ``exc`` was raised."""
+    for cause in _causes(exc):
+        match = TUNNEL_FAILED_RE.search(str(cause)) if isinstance(cause, OSError) else None
+        if match:
+            return int(match.group(1))
+    return None
+
+def is_proxy_failure(exc: BaseException) -> bool:
+    """
+    Whether a request sent through a proxy failed because of the proxy: it
+    could not be reached, spoke TLS or HTTP badly, or refused the CONNECT
+    (e.g. 407). A CONNECT answered 502/504 means the proxy is fine but the
+    target is not, and timeouts, resets and TLS errors once the tunnel is up
+    are the target's too.
+    """
+    if not isinstance(exc, requests.exceptions.ProxyError):
+        return False
+    return tunnel_status(exc) not in TARGET_TUNNEL_STATUSES
+
+def failure_reason(exc: BaseException) -> Optional[str]:
+    """
+    Classify a failed request as "dns" (the name does not resolve),
+    "refused" (nothing listens on the port), "bad_gateway" (a proxy could not
+    reach the host) or "timeout"; None for failures that say nothing about
+    whether the host is up (TLS errors, resets, the proxy's own failures, ...).
+    """
+    if is_proxy_failure(exc):
+        return None
+    status = tunnel_status(exc)
+    if status is not None:
+        return "bad_gateway" if status == 502 else "timeout" if status == 504 else None
+    timed_out = isinstance(exc, requests.Timeout)
+    for cause in _causes(exc):
+        if isinstance(cause, socket.gaierror) and cause.errno in NEGATIVE_DNS_ERRORS:
+            return "dns"
+        if isinstance(cause, ConnectionRefusedError) or getattr(cause, "errno", None) == errno.ECONNREFUSED:
+            return "refused"
+        # Read timeouts that exhausted the adapter's retries surface as a
+        # plain ConnectionError, with urllib3's timeout error inside.
+        timed_out = timed_out or isinstance(cause, (Urllib3Timeout, TimeoutError))
+    return "timeout" if timed_out else None
+
+@dataclass
+class DeadHosts:
+    """
+    Short-lived blacklist of hosts that cannot be reached.
+
+    A host is marked dead for ``ttl`` seconds as soon as its name fails to
+    resolve, its port refuses connections or a proxy answers 502 for it, or
+    after ``max_timeouts`` timeouts in a row; any response (even an error status) clears its
+    timeout count. Requests to a dead host fail at once with
+    ``HostUnavailable`` instead of paying for another lookup and connect
+    timeout.
+    """
+
+    ttl: float = 1800.0
+    max_timeouts: int = 2
+    _dead: Dict[str, Tuple[float, str]] = field(default_factory=dict, init=False, repr=False)
+    _timeouts: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def check(self, host: str) -> Optional[str]:
+        """Why ``host`` is being skipped, or None if it may be tried."""
+        with self._lock:
+            entry = self._dead.get(host)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._dead[host]
+                return None
+        return entry[1]
+
+    def record_failure(self, host: str, exc: BaseException, count_timeouts: bool = True) -> None:
+        """
+        :param count_timeouts: False when the request ran with a timeout cut
+            down to fit a deadline, which says little about the host.
+        """
+        reason = failure_reason(exc)
+        if reason is None or (reason == "timeout" and not count_timeouts):
+            return
+        with self._lock:
+            if reason == "timeout":
+                self._timeouts[host] = self._timeouts.get(host, 0) + 1
+                if self._timeouts[host] < self.max_timeouts:
+                    return
+            self._timeouts.pop(host, None)
+            if host in self._dead:
+                return
+            self._dead[host] = (time.monotonic() + self.ttl, reason)
+        DEAD_HOSTS.inc(reason=reason)
+        logger.info("Host %s is unreachable (%s); skipping it for %.0fs.", host, reason, self.ttl)
+
+    def record_success(self, host: str) -> None:
+        if host in self._timeouts:
+            with self._lock:
+                self._timeouts.pop(host, None)
+
+def dns_cache_from_config(config: Dict[str, Any]) -> Optional[DnsCache]:
+    dns_cfg = config.get("dns") or {}
+    if not dns_cfg.get("enabled", True):
+        return None
+    return DnsCache(
+        ttl=float(dns_cfg.get("ttl", 300)),
+        negative_ttl=float(dns_cfg.get("negative_ttl", 300)),
+    )
+
+def dead_hosts_from_config(config: Dict[str, Any]) -> Optional[DeadHosts]:
+    dead_cfg = config.get("dead_hosts") or {}
+    if not dead_cfg.get("enabled", True):
+        return None
+    return DeadHosts(
+        ttl=float(dead_cfg.get("ttl", 1800)),
+        max_timeouts=int(dead_cfg.get("max_timeouts", 2)),
+    )
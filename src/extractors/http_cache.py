@@ -0,0 +1,194 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlencode
+
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status_code INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    content BLOB NOT NULL,
+    encoding TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+@dataclass
+class CacheEntry:
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    encoding: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    def is_fresh(self, ttl: float, now: Optional[float] = None) -> bool:
+        return ((now or time.time()) - self.stored_at) < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+@dataclass
+class HttpCache:
+    """
+    SQLite-backed response cache shared by all fetchers.
+
+    Entries are keyed by URL and query parameters. Each request names a
+    ``source`` (e.g. "search" or "website") whose TTL decides whether a stored
+    response can be served as-is; stale entries are revalidated with
+    If-None-Match / If-Modified-Since. When the stored bodies exceed
+    ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    path: str | Path = "data/http_cache.sqlite"
+    max_bytes: int = 512 * 1024 * 1024
+    ttls: Dict[str, float] = field(default_factory=dict)
+    default_ttl: float = 86400.0
+    _conn: sqlite3.Connection = field(init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _total_bytes: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        path = Path(self.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        logger.debug("Opened HTTP cache at '%s' (%d bytes stored).", path, self._total_bytes)
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()), doseq=True)}"
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, source: str) -> float:
+        return float(self.ttls.get(source, self.default_ttl))
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status_code, headers, content, encoding, etag, last_modified, stored_at "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+        url, status_code, headers, content, encoding, etag, last_modified, stored_at = row
+        return CacheEntry(
+            url=url,
+            status_code=status_code,
+            headers=json.loads(headers),
+            content=content,
+            encoding=encoding,
+            etag=etag,
+            last_modified=last_modified,
+            stored_at=stored_at,
+        )
+
+    def put(
+        self,
+        key: str,
+        url: str,
+        status_code: int,
+        headers: Mapping[str, str],
+        content: bytes,
+        encoding: Optional[str],
+    ) -> None:
+        # Header names are case-insensitive; HTTP/2 servers and many CDNs send them lowercase.
+        headers = CaseInsensitiveDict(headers)
+        if "no-store" in headers.get("Cache-Control", "").lower():
+            return
+
+        size = len(content)
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, url, status_code, headers, content, encoding, etag, last_modified, stored_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    url,
+                    status_code,
+                    json.dumps(dict(headers)),
+                    sqlite3.Binary(content),
+                    encoding,
+                    headers.get("ETag"),
+                    headers.get("Last-Modified"),
+                    now,
+                    now,
+                    size,
+                ),
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as freshly validated after a 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, key),
+            )
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Evict down to 90% of the cap so we don't evict again on the next put.
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        evicted = 0
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= size
+            evicted += 1
+        logger.debug("Evicted %d cached response(s); %d bytes remain.", evicted, self._total_bytes)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def cache_from_config(config: Dict[str, Any]) -> HttpCache:
+    cache_cfg = config.get("cache") or {}
+    return HttpCache(
+        path=cache_cfg.get("path") or "data/http_cache.sqlite",
+        max_bytes=int(cache_cfg.get("max_mb", 512) * 1024 * 1024),
+        ttls=cache_cfg.get("ttl") or {},
+    )
@@ -0,0 +1,436 @@
+import logging
+import threading
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from extractors.host_cache import (
+    DEAD_HOST_SKIPS,
+    DeadHosts,
+    DnsCache,
+    HostUnavailable,
+    dead_hosts_from_config,
+    dns_cache_from_config,
+    is_proxy_failure,
+)
+from extractors.http_cache import CacheEntry, HttpCache, cache_from_config
+from extractors.proxy_pool import ProxyPool, proxy_label, proxy_pool_from_config
+from extractors.rate_limiter import (
+    THROTTLE_STATUS_CODES,
+    RateLimiter,
+    parse_retry_after,
+    rate_limiter_from_config,
+)
+from metrics import counter, histogram  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+REQUEST_SECONDS = histogram("http_request_seconds", "Time from sending a request to reading its body.")
+RESPONSES = counter("http_responses_total", "HTTP responses by host and status code.")
+ERRORS = counter("http_errors_total", "Requests that failed without a response, by host and error type.")
+BYTES = counter("http_response_bytes_total", "Response body bytes read, by host.")
+CACHE_LOOKUPS = counter("http_cache_total", "HTTP cache lookups by result (hit, revalidated, miss).")
+RATE_LIMIT_WAIT = histogram("rate_limit_wait_seconds", "Time spent waiting for a host's rate limiter.")
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# Errors that can break off a response body part-way.
+BODY_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+# Only business websites are blacklisted when unreachable; a slow or flaky
+# Yellow Pages host is retried and rate limited instead, never skipped.
+DEAD_HOST_SOURCES = ("website",)
+READ_CHUNK_SIZE = 64 * 1024
+
+class ContentRejected(requests.RequestException):
+    """Raised when a response's content type is not one the caller accepts."""
+
+def decode_body(content: bytes, encoding: Optional[str] = None) -> str:
+    if encoding is None and content:
+        # Same fallback as requests' apparent_encoding, but only run when the
+        # body is actually decoded.
+        encoding = chardet.detect(content)["encoding"]
+    return content.decode(encoding or "utf-8", errors="replace")
+
+@dataclass
+class FetchResponse:
+    url: str
+    status_code: int
+    headers: Mapping[str, str]
+    content: bytes
+    encoding: Optional[str] = None
+    _text: Optional[str] = field(default=None, init=False, repr=False)
+
+    @property
+    def text(self) -> str:
+        # Decode lazily and only once, no matter how many callers read the body.
+        if self._text is None:
+            self._text = decode_body(self.content, self.encoding)
+        return self._text
+
+    @classmethod
+    def from_cache(cls, entry: CacheEntry) -> "FetchResponse":
+        return cls(
+            url=entry.url,
+            status_code=entry.status_code,
+            headers=CaseInsensitiveDict(entry.headers),
+            content=entry.content,
+            encoding=entry.encoding,
+        )
+
+def build_session(
+    headers: Optional[Dict[str, str]] = None,
+    proxy: Optional[str] = None,
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    max_retries: int = 2,
+    backoff_factor: float = 0.5,
+    status_forcelist: Tuple[int, ...] = RETRY_STATUS_CODES,
+) -> requests.Session:
+    """
+    Build a keep-alive session with pooled connections and retry/backoff.
+
+    :param pool_connections: Number of per-host connection pools to keep around.
+    :param pool_maxsize: Maximum number of connections kept open to a single host.
+    :param max_retries: Retries for connection errors and retryable status codes.
+    :param backoff_factor: Exponential backoff factor between retries, in seconds.
+    :param status_forcelist: Status codes retried inside the adapter.
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=status_forcelist,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    if proxy:
+        session.proxies.update({"http": proxy, "https": proxy})
+    return session
+
+def _read_body(resp: requests.Response, max_bytes: int = 0) -> Tuple[bytes, bool]:
+    """
+    Read a streamed response body, stopping once ``max_bytes`` have arrived.
+
+    :return: The body and whether it was cut short.
+    """
+    chunks: List[bytes] = []
+    size = 0
+    for chunk in resp.iter_content(chunk_size=READ_CHUNK_SIZE):
+        chunks.append(chunk)
+        size += len(chunk)
+        if max_bytes and size > max_bytes:
+            return b"".join(chunks)[:max_bytes], True
+    return b"".join(chunks), False
+
+@dataclass
+class HttpClient:
+    """
+    Shared transport for the Yellow Pages scraper and the contact scanner.
+
+    Headers and proxy settings are applied to the underlying session once, and
+    connections are reused across requests to the same host. ``max_concurrency``
+    caps in-flight requests across all hosts and ``max_per_host`` caps them per
+    host, so concurrent jobs stay polite to Yellow Pages; 0 means unlimited.
+    A request counts as in flight until its body has been read.
+    When a ``cache`` is attached, responses are served from and stored to it.
+    When a ``rate_limiter`` is attached, every network request waits for its
+    host's token bucket, and 429/503 responses are retried here (rather than
+    inside the adapter) so the limiter sees them and backs off.
+    When a ``proxy_pool`` is attached, each request borrows a proxy from it
+    (instead of using ``proxy``) and reports back how the request went; the
+    rate limiter then keeps a separate bucket per host and proxy.
+    A ``dns_cache`` is installed as the process resolver while the client is
+    open. With ``dead_hosts`` attached, website hosts that fail to resolve,
+    refuse connections or keep timing out are skipped for a while, whether or
+    not requests go through a proxy; a proxy's own failures are not counted
+    against the hosts behind it, and search requests are never skipped.
+    """
+
+    headers: Optional[Dict[str, str]] = None
+    proxy: Optional[str] = None
+    timeout: float = 15
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    max_retries: int = 2
+    backoff_factor: float = 0.5
+    max_concurrency: int = 0
+    max_per_host: int = 0
+    cache: Optional[HttpCache] = None
+    rate_limiter: Optional[RateLimiter] = None
+    proxy_pool: Optional[ProxyPool] = None
+    dns_cache: Optional[DnsCache] = None
+    dead_hosts: Optional[DeadHosts] = None
+    session: requests.Session = field(init=False, repr=False)
+    _global_slots: Optional[threading.BoundedSemaphore] = field(default=None, init=False, repr=False)
+    _host_slots: Dict[str, threading.BoundedSemaphore] = field(default_factory=dict, init=False, repr=False)
+    _host_slots_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _latency: Dict[str, float] = field(default_factory=dict, init=False, repr=False)
+    _single_try_session: Optional[requests.Session] = field(default=None, init=False, repr=False)
+    _single_try_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.session = build_session(
+            headers=self.headers,
+            proxy=self.proxy,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=tuple(
+                code
+                for code in RETRY_STATUS_CODES
+                if self.rate_limiter is None or code not in THROTTLE_STATUS_CODES
+            ),
+        )
+        if self.max_concurrency > 0:
+            self._global_slots = threading.BoundedSemaphore(self.max_concurrency)
+        if self.dns_cache is not None:
+            self.dns_cache.install()
+
+    def _single_try(self) -> requests.Session:
+        # Built on first use: only scans under a deadline fetch without retries.
+        with self._single_try_lock:
+            if self._single_try_session is None:
+                self._single_try_session = build_session(
+                    headers=self.headers,
+                    proxy=self.proxy,
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    max_retries=0,
+                )
+            return self._single_try_session
+
+    def _host_slot(self, host: str) -> Optional[threading.BoundedSemaphore]:
+        if self.max_per_host <= 0:
+            return None
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_per_host)
+                self._host_slots[host] = slot
+            return slot
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        source: str = "default",
+        max_bytes: int = 0,
+        content_types: Optional[Tuple[str, ...]] = None,
+        retry: bool = True,
+    ) -> FetchResponse:
+        """
+        Fetch a URL and return its body. Raises ``requests.RequestException``
+        on transport errors and non-2xx responses.
+
+        The body is streamed, so oversized or unwanted responses are cut off
+        without downloading them in full.
+
+        :param source: Cache TTL bucket for this request, e.g. "search" or "website".
+        :param max_bytes: Stop reading the body after this many bytes; 0 means no limit.
+            Truncated bodies are returned but not cached.
+        :param content_types: Accepted media types. Responses declaring any other
+            Content-Type raise ``ContentRejected`` before the body is read.
+        :param retry: False to make a single attempt, for callers working to a
+            deadline that the retries and their backoff would overrun.
+        """
+        cache_key = None
+        cached: Optional[CacheEntry] = None
+        request_headers: Dict[str, str] = {}
+        if self.cache is not None:
+            cache_key = self.cache.make_key(url, params)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if cached.is_fresh(self.cache.ttl_for(source)):
+                    logger.debug("Cache hit for %s", url)
+                    CACHE_LOOKUPS.inc(result="hit", source=source)
+                    return FetchResponse.from_cache(cached)
+                request_headers = cached.conditional_headers()
+
+        host = urlparse(url).netloc.lower()
+        dead_hosts = self.dead_hosts if source in DEAD_HOST_SOURCES else None
+        if dead_hosts is not None:
+            reason = dead_hosts.check(host)
+            if reason is not None:
+                DEAD_HOST_SKIPS.inc()
+                raise HostUnavailable(f"Skipping {url}: {host} is unreachable ({reason}).")
+        session = self.session if retry else self._single_try()
+        attempt = 0
+        failovers = 0
+        failed_proxy: Optional[str] = None
+        while True:
+            proxy = self.proxy_pool.acquire(host, exclude=failed_proxy) if self.proxy_pool is not None else None
+            via = proxy_label(proxy) if proxy else None
+            started = time.perf_counter()
+            # Held until the body has been read, not just the headers, so the
+            # limits cover the whole download.
+            slots = ExitStack()
+            try:
+                if self.rate_limiter is not None:
+                    RATE_LIMIT_WAIT.observe(self.rate_limiter.acquire(host, via=via), host=host)
+                for slot in (self._global_slots, self._host_slot(host)):
+                    if slot is not None:
+                        slots.enter_context(slot)
+                started = time.perf_counter()
+                try:
+                    resp = session.get(
+                        url,
+                        params=params,
+                        headers=request_headers or None,
+                        timeout=timeout if timeout is not None else self.timeout,
+                        stream=True,
+                        proxies={"http": proxy, "https": proxy} if proxy else None,
+                    )
+                except requests.RequestException as exc:
+                    REQUEST_SECONDS.observe(time.perf_counter() - started, source=source, host=host)
+                    ERRORS.inc(host=host, error=type(exc).__name__)
+                    raise
+            except BaseException as exc:
+                slots.close()
+                # Only the proxy's own failures count against it or move the
+                # request to another proxy; a dead target is dead through any.
+                proxy_failed = proxy is not None and is_proxy_failure(exc)
+                self._release_proxy(proxy, started, failed=True if proxy_failed else None)
+                if dead_hosts is not None:
+                    dead_hosts.record_failure(host, exc, count_timeouts=retry)
+                if proxy_failed and self.proxy_pool is not None and failovers < self.proxy_pool.failover:
+                    failovers += 1
+                    failed_proxy = proxy
+                    logger.debug("Request for %s failed via proxy %s (%s); trying another.", url, via, exc)
+                    continue
+                raise
+            RESPONSES.inc(host=host, status=resp.status_code)
+            if dead_hosts is not None:
+                dead_hosts.record_success(host)
+            if self.rate_limiter is None:
+                break
+            if resp.status_code not in THROTTLE_STATUS_CODES:
+                if resp.status_code < 400:
+                    self.rate_limiter.record_success(host, via=via)
+                break
+            self.rate_limiter.throttle(host, parse_retry_after(resp.headers.get("Retry-After")), via=via)
+            if not retry or attempt >= self.max_retries:
+                break
+            attempt += 1
+            resp.close()
+            slots.close()
+            self._release_proxy(proxy, started)
+        body_failed = False
+        try:
+            if resp.status_code == 304 and cached is not None:
+                logger.debug("Cached copy of %s revalidated (304).", url)
+                CACHE_LOOKUPS.inc(result="revalidated", source=source)
+                self.cache.touch(cache_key)
+                return FetchResponse.from_cache(cached)
+            if cache_key is not None:
+                CACHE_LOOKUPS.inc(result="miss", source=source)
+
+            resp.raise_for_status()
+            if content_types:
+                media_type = resp.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                if media_type and media_type not in content_types:
+                    raise ContentRejected(f"Unwanted content type '{media_type}'", response=resp)
+
+            content, truncated = _read_body(resp, max_bytes)
+            BYTES.inc(len(content), host=host)
+            if truncated:
+                logger.debug("Stopped reading %s after %d bytes.", url, max_bytes)
+            fetched = FetchResponse(
+                url=resp.url,
+                status_code=resp.status_code,
+                headers=resp.headers,
+                content=content,
+                encoding=resp.encoding,
+            )
+            if cache_key is not None and resp.status_code == 200 and not truncated:
+                self.cache.put(
+                    cache_key,
+                    url=fetched.url,
+                    status_code=fetched.status_code,
+                    headers=resp.headers,
+                    content=fetched.content,
+                    encoding=fetched.encoding,
+                )
+            return fetched
+        except BODY_ERRORS as exc:
+            # The proxy delivered the headers; a body cut short is the target's doing.
+            body_failed = True
+            if dead_hosts is not None:
+                dead_hosts.record_failure(host, exc, count_timeouts=retry)
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            REQUEST_SECONDS.observe(seconds, source=source, host=host)
+            if not body_failed:
+                previous = self._latency.get(host)
+                self._latency[host] = seconds if previous is None else 0.8 * previous + 0.2 * seconds
+            resp.close()
+            slots.close()
+            self._release_proxy(proxy, started, failed=None if body_failed else False)
+
+    def host_latency(self, host: str) -> Optional[float]:
+        """Moving average of the time to fetch a page (headers and body) from ``host`` in seconds, None if not seen yet."""
+        return self._latency.get(host)
+
+    def _release_proxy(self, proxy: Optional[str], started: float, failed: Optional[bool] = False) -> None:
+        if proxy is not None and self.proxy_pool is not None:
+            self.proxy_pool.release(proxy, time.perf_counter() - started, failed=failed)
+
+    def close(self) -> None:
+        if self.dns_cache is not None:
+            self.dns_cache.uninstall()
+        if self.proxy_pool is not None:
+            for row in self.proxy_pool.snapshot():
+                logger.info("Proxy %(proxy)s: %(status)s, %(latency_ms)sms, error rate %(error_rate)s.", row)
+        self.session.close()
+        if self._single_try_session is not None:
+            self._single_try_session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+def client_from_config(
+    config: Dict[str, Any],
+    min_pool_size: int = 1,
+    proxy_pool: Optional[ProxyPool] = None,
+) -> HttpClient:
+    http_cfg = config.get("http") or {}
+    cache_cfg = config.get("cache") or {}
+    return HttpClient(
+        headers=config.get("headers") or {},
+        proxy=config.get("proxy") if isinstance(config.get("proxy"), str) else None,
+        timeout=config.get("timeout", 15),
+        pool_connections=http_cfg.get("pool_connections", 10),
+        pool_maxsize=max(http_cfg.get("pool_maxsize", 10), min_pool_size),
+        max_retries=http_cfg.get("max_retries", 2),
+        backoff_factor=http_cfg.get("backoff_factor", 0.5),
+        max_concurrency=http_cfg.get("max_concurrency", 0),
+        max_per_host=http_cfg.get("max_per_host", 0),
+        cache=cache_from_config(config) if cache_cfg.get("enabled") else None,
+        rate_limiter=rate_limiter_from_config(config),
+        proxy_pool=proxy_pool if proxy_pool is not None else proxy_pool_from_config(config),
+        dns_cache=dns_cache_from_config(config),
+        dead_hosts=dead_hosts_from_config(config),
+    )
@@ -0,0 +1,48 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class ParsePool:
+    """
+    Runs CPU-bound HTML parsing in worker processes, outside the GIL.
+
+    Fetching stays on the caller's I/O threads; only the raw response bytes go
+    to a worker and only plain results (dicts, sets, dataclasses) come back, so
+    no parse trees are pickled. ``fn`` must be a module-level function, such as
+    ``parse_search_response`` or ``extract_page``. With ``processes=0`` the work
+    runs inline in the calling thread.
+    """
+
+    def __init__(self, processes: int = 0) -> None:
+        self.processes = max(0, processes)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        if self.processes:
+            # Forking a process that already runs fetch threads is unsafe, so
+            # workers start from a clean interpreter instead.
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=context)
+            logger.info("Parsing pages in %d worker processes.", self.processes)
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self._executor is None:
+            return fn(*args)
+        return self._executor.submit(fn, *args).result()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+def parse_pool_from_config(config: Dict[str, Any]) -> Optional[ParsePool]:
+    processes = (config.get("parse") or {}).get("processes") or 0
+    if processes == "auto":
+        processes = os.cpu_count() or 1
+    processes = int(processes)
+    return ParsePool(processes) if processes > 0 else None
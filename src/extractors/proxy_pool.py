@@ -0,0 +1,241 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from metrics import counter, histogram  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+PROXY_REQUESTS = counter("proxy_requests_total", "Requests sent through each proxy, by result (ok, error or target_error).")
+PROXY_EVICTIONS = counter("proxy_evictions_total", "Times a proxy was taken out of rotation as unhealthy.")
+PROXY_WAIT = histogram("proxy_wait_seconds", "Time spent waiting for a free, healthy proxy.")
+
+# Floor for the latency estimate, so untried proxies and very fast ones still
+# rank by load and error rate.
+LATENCY_FLOOR = 0.05
+ASSIGNMENTS = ("request", "host")
+
+def proxy_label(url: str) -> str:
+    """Proxy address without credentials, for logs and metric labels."""
+    parsed = urlparse(url if "://" in url else f"http://{url}")
+    return f"{parsed.hostname or ''}:{parsed.port}" if parsed.port else parsed.hostname or url
+
+def load_proxy_file(path: str | Path) -> List[str]:
+    """Read one proxy URL per line; blank lines and '#' comments are skipped."""
+    proxies: List[str] = []
+    with Path(path).open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                proxies.append(line)
+    return proxies
+
+@dataclass
+class _ProxyState:
+    url: str
+    label: str
+    in_flight: int = 0
+    requests: int = 0
+    latency: float = 0.0  # moving average of successful request time, seconds
+    error_rate: float = 0.0  # moving average of failures, 0..1
+    consecutive_failures: int = 0
+    down_until: float = 0.0
+    strikes: int = 0  # evictions since the last healthy stretch; lengthens the cooldown
+    probation: bool = False
+    last_used: float = 0.0
+    hosts: int = 0
+
+    def score(self) -> float:
+        return max(self.latency, LATENCY_FLOOR) * (self.in_flight + 1) * (1.0 + 4.0 * self.error_rate)
+
+@dataclass
+class ProxyPool:
+    """
+    Spreads requests over a fleet of proxies and keeps bad ones out of rotation.
+
+    With ``assignment="request"`` every request goes to the healthy proxy with
+    the best mix of latency, load and error rate; with ``"host"`` each host
+    sticks to one proxy until that proxy is taken out of rotation. At most
+    ``max_per_proxy`` requests use a proxy at once (0 means unlimited).
+
+    A proxy is evicted after ``max_consecutive_failures`` failures in a row, or
+    once its error rate passes ``max_error_rate`` over at least
+    ``min_requests`` requests. It returns after ``cooldown`` seconds on
+    probation, carrying one request at a time: a success restores it, another
+    failure evicts it again for twice as long, up to ``max_cooldown``.
+    Failures are the proxy's own: it cannot be reached or refuses to open a
+    tunnel. HTTP error responses, CONNECT answers of 502/504 and timeouts or
+    resets from the target site are the target's business and do not count.
+    A request that fails at the proxy is tried again through another proxy
+    up to ``failover`` times.
+    """
+
+    proxies: List[str]
+    assignment: str = "request"
+    max_per_proxy: int = 4
+    max_error_rate: float = 0.5
+    min_requests: int = 5
+    max_consecutive_failures: int = 3
+    cooldown: float = 60.0
+    max_cooldown: float = 900.0
+    failover: int = 2
+    smoothing: float = 0.2  # weight of the newest sample in the moving averages
+    _states: Dict[str, _ProxyState] = field(default_factory=dict, init=False, repr=False)
+    _host_proxy: Dict[str, str] = field(default_factory=dict, init=False, repr=False)
+    _cond: threading.Condition = field(default_factory=threading.Condition, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.assignment not in ASSIGNMENTS:
+            raise ValueError(f"Unknown proxy assignment '{self.assignment}'; expected one of {ASSIGNMENTS}.")
+        for url in self.proxies:
+            self._states.setdefault(url, _ProxyState(url=url, label=proxy_label(url)))
+        if not self._states:
+            raise ValueError("A proxy pool needs at least one proxy.")
+
+    def _usable(self, state: _ProxyState, now: float) -> bool:
+        if now < state.down_until:
+            return False
+        limit = 1 if state.probation else self.max_per_proxy
+        return limit <= 0 or state.in_flight < limit
+
+    def _pick(self, host: str, now: float, exclude: Optional[str]) -> Optional[_ProxyState]:
+        if exclude is not None and not any(
+            s.url != exclude and now >= s.down_until for s in self._states.values()
+        ):
+            exclude = None  # no other proxy is in rotation; better the same one than none
+        if self.assignment == "host":
+            assigned = self._states.get(self._host_proxy.get(host, ""))
+            if assigned is not None and now >= assigned.down_until and assigned.url != exclude:
+                # Stay on the host's proxy while it is healthy, even if busy.
+                return assigned if self._usable(assigned, now) else None
+            candidates = [s for s in self._states.values() if s.url != exclude and self._usable(s, now)]
+            if not candidates:
+                return None
+            chosen = min(candidates, key=lambda s: (s.hosts, s.score(), s.last_used))
+            if assigned is not None:
+                assigned.hosts -= 1
+            chosen.hosts += 1
+            self._host_proxy[host] = chosen.url
+            return chosen
+
+        candidates = [s for s in self._states.values() if s.url != exclude and self._usable(s, now)]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda s: (s.score(), s.last_used))
+
+    def acquire(self, host: str, exclude: Optional[str] = None) -> str:
+        """
+        Block until a healthy proxy with a free slot is available for ``host``
+        and reserve it. Every ``acquire`` must be paired with a ``release``.
+
+        :param exclude: A proxy that just failed this request; another one is
+            used (and, with host assignment, takes over the host) when possible.
+        """
+        started = time.monotonic()
+        warned = False
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                state = self._pick(host, now, exclude)
+                if state is not None:
+                    state.in_flight += 1
+                    state.last_used = now
+                    break
+                returning = [s.down_until for s in self._states.values() if s.down_until > now]
+                if not warned and len(returning) == len(self._states):
+                    logger.warning("All %d proxies are out of rotation; waiting for one to return.", len(returning))
+                    warned = True
+                # Woken by release(); the timeout covers proxies coming back from cooldown.
+                timeout = min(returning) - now if returning else None
+                self._cond.wait(timeout=timeout if timeout is None else max(0.01, min(timeout, 1.0)))
+        PROXY_WAIT.observe(time.monotonic() - started)
+        return state.url
+
+    def release(self, proxy: str, seconds: float, failed: Optional[bool] = False) -> None:
+        """
+        Return a proxy reserved by ``acquire`` and record how the request went.
+
+        :param failed: None when the request failed for reasons that say
+            nothing about the proxy (the target site was down or slow); the
+            proxy's slot is freed without touching its health.
+        """
+        evicted: Optional[float] = None
+        with self._cond:
+            state = self._states[proxy]
+            state.in_flight = max(0, state.in_flight - 1)
+            if failed is None:
+                self._cond.notify_all()
+                PROXY_REQUESTS.inc(proxy=state.label, result="target_error")
+                return
+            state.requests += 1
+            weight = self.smoothing
+            state.error_rate = (1 - weight) * state.error_rate + weight * (1.0 if failed else 0.0)
+            if failed:
+                state.consecutive_failures += 1
+            else:
+                state.consecutive_failures = 0
+                state.latency = seconds if state.latency == 0.0 else (1 - weight) * state.latency + weight * seconds
+
+            if state.probation and not failed:
+                state.probation = False
+                state.strikes = 0
+                logger.info("Proxy %s is healthy again.", state.label)
+            elif failed and (
+                state.probation
+                or state.consecutive_failures >= self.max_consecutive_failures
+                or (state.requests >= self.min_requests and state.error_rate > self.max_error_rate)
+            ):
+                evicted = min(self.max_cooldown, self.cooldown * (2 ** state.strikes))
+                state.strikes += 1
+                state.down_until = time.monotonic() + evicted
+                state.probation = True
+                state.requests = 0
+                state.error_rate = 0.0
+                state.consecutive_failures = 0
+            self._cond.notify_all()
+
+        PROXY_REQUESTS.inc(proxy=state.label, result="error" if failed else "ok")
+        if evicted is not None:
+            PROXY_EVICTIONS.inc(proxy=state.label)
+            logger.warning("Proxy %s is failing; taking it out of rotation for %.1fs.", state.label, evicted)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._cond:
+            return [
+                {
+                    "proxy": state.label,
+                    "in_flight": state.in_flight,
+                    "latency_ms": round(state.latency * 1000, 1),
+                    "error_rate": round(state.error_rate, 3),
+                    "status": "down" if now < state.down_until else "probation" if state.probation else "up",
+                }
+                for state in self._states.values()
+            ]
+
+def proxy_pool_from_config(config: Dict[str, Any]) -> Optional[ProxyPool]:
+    proxies_cfg = config.get("proxies") or {}
+    urls = list(proxies_cfg.get("urls") or [])
+    if isinstance(config.get("proxy"), list):
+        urls.extend(config["proxy"])
+    if proxies_cfg.get("file"):
+        urls.extend(load_proxy_file(proxies_cfg["file"]))
+    if not urls:
+        return None
+    pool = ProxyPool(
+        proxies=list(dict.fromkeys(urls)),
+        assignment=proxies_cfg.get("assignment") or "request",
+        max_per_proxy=int(proxies_cfg.get("max_per_proxy", 4)),
+        max_error_rate=float(proxies_cfg.get("max_error_rate", 0.5)),
+        min_requests=int(proxies_cfg.get("min_requests", 5)),
+        max_consecutive_failures=int(proxies_cfg.get("max_consecutive_failures", 3)),
+        cooldown=float(proxies_cfg.get("cooldown", 60)),
+        max_cooldown=float(proxies_cfg.get("max_cooldown", 900)),
+        failover=int(proxies_cfg.get("failover", 2)),
+    )
+    logger.info("Using a pool of %d proxies (%s assignment).", len(pool.proxies), pool.assignment)
+    return pool
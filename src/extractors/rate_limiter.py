@@ -0,0 +1,153 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Responses that mean "slow down" rather than "this request failed".
+THROTTLE_STATUS_CODES = (429, 503)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date) into seconds from now.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, when.timestamp() - time.time())
+
+@dataclass
+class _HostBucket:
+    rate: float
+    tokens: float
+    updated: float
+    paused_until: float = 0.0
+
+@dataclass
+class RateLimiter:
+    """
+    Per-host token bucket shared by every fetcher using the same HttpClient.
+
+    Each host starts at ``initial_rate`` requests per second (or its entry in
+    ``host_rates``) with up to ``burst`` requests allowed back to back. A 429 or
+    503 multiplies the host's rate by ``decrease`` and pauses the host for the
+    server's Retry-After, or for one request interval when none is given. Every
+    healthy response adds ``increase`` requests per second back, up to
+    ``max_rate``, so each host settles near the fastest rate it tolerates.
+
+    Requests sent through a proxy pass ``via``: servers limit each client
+    address separately, so every (host, proxy) pair gets its own bucket.
+    """
+
+    initial_rate: float = 5.0
+    min_rate: float = 0.2
+    max_rate: float = 20.0
+    increase: float = 0.25
+    decrease: float = 0.5
+    burst: float = 4.0
+    host_rates: Dict[str, float] = field(default_factory=dict)
+    _buckets: Dict[Tuple[str, Optional[str]], _HostBucket] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def _bucket(self, host: str, via: Optional[str] = None) -> _HostBucket:
+        bucket = self._buckets.get((host, via))
+        if bucket is None:
+            rate = self.host_rates.get(host, self.initial_rate)
+            rate = min(max(rate, self.min_rate), self.max_rate)
+            bucket = _HostBucket(rate=rate, tokens=self.burst, updated=time.monotonic())
+            self._buckets[(host, via)] = bucket
+        return bucket
+
+    def set_rate(self, host: str, rate: float) -> None:
+        """
+        Set the starting rate for ``host``. Adaptive adjustment continues from there.
+        """
+        with self._lock:
+            self.host_rates[host] = rate
+            for key in [key for key in self._buckets if key[0] == host]:
+                del self._buckets[key]
+
+    def rate(self, host: str, via: Optional[str] = None) -> float:
+        with self._lock:
+            return self._bucket(host, via).rate
+
+    def acquire(self, host: str, via: Optional[str] = None) -> float:
+        """
+        Block until ``host`` may be sent another request.
+
+        :return: Seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                bucket = self._bucket(host, via)
+                now = time.monotonic()
+                if now >= bucket.paused_until:
+                    start = max(bucket.updated, bucket.paused_until)
+                    bucket.tokens = min(self.burst, bucket.tokens + (now - start) * bucket.rate)
+                    bucket.updated = now
+                    if bucket.tokens >= 1.0:
+                        bucket.tokens -= 1.0
+                        return waited
+                    wait = (1.0 - bucket.tokens) / bucket.rate
+                else:
+                    wait = bucket.paused_until - now
+            # Sleep outside the lock and re-check: a throttle response from
+            # another thread may have paused the host in the meantime.
+            time.sleep(wait)
+            waited += wait
+
+    def record_success(self, host: str, via: Optional[str] = None) -> None:
+        with self._lock:
+            bucket = self._bucket(host, via)
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+    def throttle(self, host: str, retry_after: Optional[float] = None, via: Optional[str] = None) -> None:
+        """
+        Back off after ``host`` answered 429/503.
+        """
+        with self._lock:
+            bucket = self._bucket(host, via)
+            now = time.monotonic()
+            # Requests already in flight when the host first pushed back tend to
+            # be throttled too; count them as one event, not one halving each.
+            if now >= bucket.paused_until:
+                bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+            pause = retry_after if retry_after is not None else 1.0 / bucket.rate
+            bucket.paused_until = max(bucket.paused_until, now + pause)
+            bucket.tokens = 0.0
+            rate = bucket.rate
+        logger.warning(
+            "Throttled by %s%s; pausing %.1fs, rate now %.2f req/s.",
+            host,
+            f" via {via}" if via else "",
+            pause,
+            rate,
+        )
+
+def rate_limiter_from_config(config: Dict[str, Any]) -> Optional[RateLimiter]:
+    limit_cfg = config.get("rate_limit") or {}
+    if not limit_cfg.get("enabled", True):
+        return None
+    return RateLimiter(
+        initial_rate=float(limit_cfg.get("initial_rate", 5.0)),
+        min_rate=float(limit_cfg.get("min_rate", 0.2)),
+        max_rate=float(limit_cfg.get("max_rate", 20.0)),
+        increase=float(limit_cfg.get("increase", 0.25)),
+        decrease=float(limit_cfg.get("decrease", 0.5)),
+        burst=float(limit_cfg.get("burst", 4)),
+    )
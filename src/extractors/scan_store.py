@@ -0,0 +1,73 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from records import ContactInfo  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    domain TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    scanned_at REAL NOT NULL
+);
+"""
+
+@dataclass
+class ScanStore:
+    """
+    Cross-run store of contact scan results keyed by normalized website domain.
+
+    Results older than ``max_age`` seconds are ignored and get replaced by the
+    next scan of the same domain. Results are stored in their exported JSON
+    shape, so the store stays readable by other tools.
+    """
+
+    path: str | Path = "data/scan_store.sqlite"
+    max_age: float = 30 * 86400.0
+    _conn: sqlite3.Connection = field(init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        path = Path(self.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, domain: str) -> Optional[ContactInfo]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, scanned_at FROM scans WHERE domain = ?",
+                (domain,),
+            ).fetchone()
+        if row is None or time.time() - row[1] >= self.max_age:
+            return None
+        return ContactInfo.from_dict(json.loads(row[0]))
+
+    def put(self, domain: str, result: ContactInfo) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scans (domain, result, scanned_at) VALUES (?, ?, ?)",
+                (domain, json.dumps(result.to_dict()), time.time()),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def scan_store_from_config(config: Dict[str, Any]) -> Optional[ScanStore]:
+    store_cfg = config.get("scan_store") or {}
+    if not store_cfg.get("enabled"):
+        return None
+    return ScanStore(
+        path=store_cfg.get("path") or "data/scan_store.sqlite",
+        max_age=float(store_cfg.get("max_age_days", 30)) * 86400.0,
+    )
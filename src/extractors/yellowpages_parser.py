@@ -1,14 +1,141 @@
-thonimport logging
+import logging
+import math
+import re
 import time
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
-from urllib.parse import urlencode, urljoin
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlencode, urljoin, urlparse
 
+import lxml.html
 import requests
-from bs4 import BeautifulSoup, Tag
+from lxml import etree
+
+from extractors.http_client import FetchResponse, HttpClient, decode_body
+from extractors.parse_pool import ParsePool
+from metrics import histogram  # type: ignore
+from records import Listing  # type: ignore
 
 logger = logging.getLogger(__name__)
 
+PARSE_SECONDS = histogram("parse_seconds", "Time to parse one page, by kind (search or website).")
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Compiled once at import; XPath node-sets come back in document order, so
+# taking the first match mirrors BeautifulSoup's select_one() on the same CSS.
+# A v-card nested inside a div.result is the same listing, not a second one.
+CARDS_XPATH = etree.XPath(
+    f"//div[{_has_class('result')} or ({_has_class('v-card')} and not(ancestor::div[{_has_class('result')}]))]"
+)
+# "a.business-name span, a.business-name": the anchor always precedes its own
+# spans in document order, so the first match is the anchor itself.
+NAME_XPATH = etree.XPath(f".//a[{_has_class('business-name')}]")
+ADDRESS_XPATH = etree.XPath(f".//p[{_has_class('adr')}] | .//*[{_has_class('street-address')}]")
+LOCALITY_XPATH = etree.XPath(f".//*[{_has_class('locality')}]")
+PHONE_XPATH = etree.XPath(f".//*[{_has_class('phones')}]")
+WEBSITE_XPATH = etree.XPath(
+    f".//a[{_has_class('track-visit-website')} or {_has_class('website-link')} or starts-with(@href, 'http')]"
+)
+NEXT_PAGE_XPATH = etree.XPath(
+    f"//a[{_has_class('next')} or {_has_class('pagination-next')} or @rel='next']"
+)
+# "Showing 1-30 of 1,234" above the results.
+SHOWING_COUNT_XPATH = etree.XPath(f"//*[{_has_class('showing-count')}]")
+TOTAL_RE = re.compile(r"\bof\s+([\d,]+)")
+
+@dataclass
+class SearchPage:
+    listings: List[Listing] = field(default_factory=list)
+    has_next: bool = False
+    total: Optional[int] = None  # results the whole search has, when the page says
+
+def _first(xpath: etree.XPath, node: Any) -> Optional[Any]:
+    matches = xpath(node)
+    return matches[0] if matches else None
+
+def _parse_html(html: str) -> Optional[Any]:
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # lxml refuses str input that carries an XML encoding declaration.
+        return lxml.html.document_fromstring(html.encode("utf-8"))
+    except etree.ParserError:
+        return None
+
+def parse_listing(card: Any, base_url: str) -> Listing:
+    def text_of(element: Optional[Any]) -> Optional[str]:
+        if element is None:
+            return None
+        return "".join(part.strip() for part in element.itertext()) or None
+
+    name_el = _first(NAME_XPATH, card)
+    address_el = _first(ADDRESS_XPATH, card)
+    locality_el = _first(LOCALITY_XPATH, card)
+    phone_el = _first(PHONE_XPATH, card)
+    website_el = _first(WEBSITE_XPATH, card)
+
+    name = text_of(name_el)
+    street = text_of(address_el)
+    locality = text_of(locality_el)
+    address = f"{street}, {locality}" if street and locality else street
+
+    phone = text_of(phone_el)
+    website = website_el.get("href") if website_el is not None and website_el.get("href") else None
+
+    listing_url_el = name_el
+    listing_url = listing_url_el.get("href") if listing_url_el is not None and listing_url_el.get("href") else None
+    if listing_url and not listing_url.startswith("http"):
+        listing_url = urljoin(base_url, listing_url)
+
+    logger.debug(
+        "Parsed listing: name=%s, address=%s, phone=%s, website=%s",
+        name,
+        address,
+        phone,
+        website,
+    )
+
+    return Listing(name=name, address=address, phone=phone, website=website, listing_url=listing_url)
+
+def parse_search_page(html: str, base_url: str) -> SearchPage:
+    """
+    Parse a search results page once, returning its listings and pagination state.
+    """
+    root = _parse_html(html)
+    if root is None:
+        return SearchPage()
+
+    cards = CARDS_XPATH(root)
+    logger.debug("Found %d listing cards on page.", len(cards))
+    results: List[Listing] = []
+
+    for card in cards:
+        try:
+            listing = parse_listing(card, base_url)
+            if listing.name:
+                results.append(listing)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Error parsing listing card: %s", exc)
+
+    return SearchPage(listings=results, has_next=bool(NEXT_PAGE_XPATH(root)), total=_total_results(root))
+
+def _total_results(root: Any) -> Optional[int]:
+    counter = _first(SHOWING_COUNT_XPATH, root)
+    if counter is None:
+        return None
+    match = TOTAL_RE.search(" ".join(counter.itertext()))
+    return int(match.group(1).replace(",", "")) if match else None
+
+def parse_search_response(content: bytes, base_url: str, encoding: Optional[str] = None) -> SearchPage:
+    """
+    Decode and parse a raw search results response. Module-level and
+    bytes-in/dataclass-out so it can run in a ``ParsePool`` worker process.
+    """
+    return parse_search_page(decode_body(content, encoding), base_url)
+
+
 @dataclass
 class YellowPagesScraper:
     base_url: str = "https://www.yellowpages.com"
@@ -16,93 +143,153 @@ class YellowPagesScraper:
     headers: Optional[Dict[str, str]] = None
     proxy: Optional[str] = None
     request_delay: float = 0.0
+    client: Optional[HttpClient] = None
+    parse_pool: Optional[ParsePool] = None
+    prefetch: int = 0  # results pages fetched concurrently once the total is known; 0 = one at a time
 
-    def _request(self, path: str, params: Dict[str, Any]) -> Optional[str]:
+    def __post_init__(self) -> None:
+        if self.client is None:
+            self.client = HttpClient(headers=self.headers, proxy=self.proxy, timeout=self.timeout)
+        if self.request_delay > 0 and self.client.rate_limiter is not None:
+            # The delay only sets the starting pace; the limiter adapts from there.
+            host = urlparse(self.base_url).netloc.lower()
+            self.client.rate_limiter.set_rate(host, 1.0 / self.request_delay)
+
+    def _request(self, path: str, params: Dict[str, Any]) -> Optional[FetchResponse]:
         url = urljoin(self.base_url, path)
-        proxies = {"http": self.proxy, "https": self.proxy} if self.proxy else None
         try:
             logger.debug("Requesting URL: %s with params %s", url, params)
-            resp = requests.get(
-                url,
-                params=params,
-                headers=self.headers,
-                timeout=self.timeout,
-                proxies=proxies,
-            )
-            resp.raise_for_status()
-            if self.request_delay > 0:
+            resp = self.client.get(url, params=params, timeout=self.timeout, source="search")
+            if self.request_delay > 0 and self.client.rate_limiter is None:
                 time.sleep(self.request_delay)
-            return resp.text
+            return resp
         except requests.RequestException as exc:
             logger.error("Failed to fetch '%s': %s", url, exc)
             return None
 
-    def _parse_listing(self, card: Tag) -> Dict[str, Any]:
-        def text_or_not_found(element: Optional[Tag]) -> str:
-            if element is None:
-                return "Not Found"
-            text = element.get_text(strip=True)
-            return text if text else "Not Found"
-
-        name_el = card.select_one("a.business-name span, a.business-name")
-        address_el = card.select_one("p.adr, .street-address")
-        locality_el = card.select_one(".locality")
-        phone_el = card.select_one("div.phones, .phones")
-        website_el = card.select_one("a.track-visit-website, a.website-link, a[href^='http']")
-
-        name = text_or_not_found(name_el)
-        street = text_or_not_found(address_el)
-        locality = text_or_not_found(locality_el)
-        address = (
-            f"{street}, {locality}" if street != "Not Found" and locality != "Not Found" else street or locality
-        )
-        if not address or address == "Not Found, Not Found":
-            address = "Not Found"
-
-        phone = text_or_not_found(phone_el)
-        website = website_el.get("href") if website_el and website_el.get("href") else "Not Found"
-
-        listing_url_el = card.select_one("a.business-name")
-        listing_url = listing_url_el.get("href") if listing_url_el and listing_url_el.get("href") else None
-        if listing_url and not listing_url.startswith("http"):
-            listing_url = urljoin(self.base_url, listing_url)
-
-        logger.debug(
-            "Parsed listing: name=%s, address=%s, phone=%s, website=%s",
-            name,
-            address,
-            phone,
-            website,
-        )
+    def _parse_listing(self, card: Any) -> Listing:
+        return parse_listing(card, self.base_url)
+
+    def _parse_page(self, html: str) -> SearchPage:
+        return parse_search_page(html, self.base_url)
 
+    def _search_params(self, keyword: str, location: str, sort: str, page: int) -> Dict[str, Any]:
         return {
-            "name": name,
-            "address": address,
-            "phone": phone,
-            "website": website,
-            "listing_url": listing_url or "Not Found",
+            "search_terms": keyword,
+            "geo_location_terms": location,
+            "page": page,
+            "sort": sort,
         }
 
-    def _parse_results_page(self, html: str) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(html, "lxml")
-        cards = soup.select("div.result, div.v-card")
-        logger.debug("Found %d listing cards on page.", len(cards))
-        results: List[Dict[str, Any]] = []
+    def _fetch_page(self, params: Dict[str, Any]) -> Optional[SearchPage]:
+        """Fetch and parse one results page; None when nothing came back."""
+        resp = self._request("/search", params=params)
+        if resp is None or not resp.content:
+            return None
+        with PARSE_SECONDS.time(kind="search"):
+            if self.parse_pool is not None:
+                return self.parse_pool.run(parse_search_response, resp.content, self.base_url, resp.encoding)
+            return self._parse_page(resp.text)
 
-        for card in cards:
-            try:
-                listing = self._parse_listing(card)
-                if listing["name"] != "Not Found":
-                    results.append(listing)
-            except Exception as exc:  # noqa: BLE001
-                logger.exception("Error parsing listing card: %s", exc)
+    def _last_page(self, parsed: SearchPage, page: int, wanted: int) -> int:
+        """Last page worth fetching after ``page`` to collect ``wanted`` more listings."""
+        per_page = len(parsed.listings)
+        return min(math.ceil((parsed.total or 0) / per_page), page + math.ceil(wanted / per_page))
 
-        return results
+    def iter_search_pages(
+        self,
+        keyword: str,
+        location: str,
+        max_results: int = 50,
+        sort: str = "bestmatch",
+        start_page: int = 1,
+        collected: int = 0,
+        seen: Optional[Iterable[Tuple[str, ...]]] = None,
+    ) -> Iterator[List[Listing]]:
+        """
+        Yield the listings of each Yellow Pages results page as soon as it is parsed.
+
+        Pagination stops once ``max_results`` listings have been yielded; the last
+        page is trimmed so the total never exceeds it. Listings already yielded
+        from an earlier page are dropped. ``start_page``, ``collected`` and
+        ``seen`` (the keys of the listings it already has) let a resumed run
+        continue where an earlier one stopped.
 
-    def _has_next_page(self, html: str) -> bool:
-        soup = BeautifulSoup(html, "lxml")
-        next_link = soup.select_one("a.next, a.pagination-next, a[rel='next']")
-        return bool(next_link)
+        With ``prefetch`` set, the result count on the first page decides how
+        many more pages are needed, and those are fetched up to ``prefetch`` at
+        a time (still under the client's rate limiter) while pages are yielded
+        in order.
+        """
+        total = collected
+        page = start_page
+        seen_keys: Set[Tuple[str, ...]] = set(seen or ())
+        ahead: Dict[int, Future] = {}
+        executor: Optional[ThreadPoolExecutor] = None
+
+        try:
+            while total < max_results:
+                params = self._search_params(keyword, location, sort, page)
+                future = ahead.pop(page, None)
+                if future is not None:
+                    parsed = future.result()
+                else:
+                    logger.info(
+                        "Fetching search page %d (current results: %d / %d). Params=%s",
+                        page,
+                        total,
+                        max_results,
+                        urlencode(params),
+                    )
+                    parsed = self._fetch_page(params)
+                if parsed is None:
+                    logger.warning("No HTML returned for page %d. Stopping pagination.", page)
+                    break
+                if not parsed.listings:
+                    logger.info("No results found on page %d. Stopping.", page)
+                    break
+
+                page_results = []
+                for listing in parsed.listings:
+                    key = listing.key()
+                    if key not in seen_keys:
+                        seen_keys.add(key)
+                        page_results.append(listing)
+                page_results = page_results[: max_results - total]
+                total += len(page_results)
+                logger.info("Accumulated %d results after page %d.", total, page)
+                yield page_results
+
+                if total >= max_results:
+                    break
+
+                if not parsed.has_next:
+                    logger.info("No next page link found. Stopping pagination.")
+                    break
+
+                page += 1
+                if self.prefetch > 0 and not ahead and parsed.total:
+                    # Repeated listings can leave the run short after the last
+                    # prefetched page; it then carries on from there.
+                    last = self._last_page(parsed, page - 1, max_results - total)
+                    if last >= page:
+                        logger.info(
+                            "Search reports %d results; fetching pages %d-%d, up to %d at a time.",
+                            parsed.total,
+                            page,
+                            last,
+                            self.prefetch,
+                        )
+                        if executor is None:
+                            executor = ThreadPoolExecutor(max_workers=self.prefetch, thread_name_prefix="search-page")
+                        ahead = {
+                            number: executor.submit(
+                                self._fetch_page, self._search_params(keyword, location, sort, number)
+                            )
+                            for number in range(page, last + 1)
+                        }
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
 
     def search(
         self,
@@ -110,7 +297,7 @@ class YellowPagesScraper:
         location: str,
         max_results: int = 50,
         sort: str = "bestmatch",
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Listing]:
         """
         Search Yellow Pages for businesses matching the keyword and location.
 
@@ -119,47 +306,9 @@ class YellowPagesScraper:
         :param max_results: Maximum number of listings to return.
         :param sort: Sort mode, typically 'bestmatch', 'distance', 'rating', or 'name'.
         """
-        results: List[Dict[str, Any]] = []
-        page = 1
-
-        while len(results) < max_results:
-            params = {
-                "search_terms": keyword,
-                "geo_location_terms": location,
-                "page": page,
-                "sort": sort,
-            }
-
-            logger.info(
-                "Fetching search page %d (current results: %d / %d). Params=%s",
-                page,
-                len(results),
-                max_results,
-                urlencode(params),
-            )
-            html = self._request("/search", params=params)
-            if not html:
-                logger.warning("No HTML returned for page %d. Stopping pagination.", page)
-                break
-
-            page_results = self._parse_results_page(html)
-            if not page_results:
-                logger.info("No results found on page %d. Stopping.", page)
-                break
-
+        results: List[Listing] = []
+        for page_results in self.iter_search_pages(keyword, location, max_results, sort):
             results.extend(page_results)
-            logger.info("Accumulated %d results after page %d.", len(results), page)
-
-            if len(results) >= max_results:
-                break
-
-            if not self._has_next_page(html):
-                logger.info("No next page link found. Stopping pagination.")
-                break
 
-            page += 1
-
-        # Trim to max_results
-        trimmed_results = results[:max_results]
-        logger.info("Search complete. Returning %d results.", len(trimmed_results))
-        return trimmed_results
\ No newline at end of file
+        logger.info("Search complete. Returning %d results.", len(results))
+        return results
@@ -0,0 +1,354 @@
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _format_labels(key: LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        '{}="{}"'.format(name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+@dataclass
+class Counter:
+    name: str
+    help: str = ""
+    _values: Dict[LabelKey, float] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{"labels": dict(key), "value": value} for key, value in self._values.items()]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value:g}")
+        return lines
+
+@dataclass
+class _HistogramSeries:
+    counts: List[int]
+    count: int = 0
+    sum: float = 0.0
+    max: float = 0.0
+
+@dataclass
+class Histogram:
+    name: str
+    help: str = ""
+    buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    _series: Dict[LabelKey, _HistogramSeries] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = _HistogramSeries(counts=[0] * (len(self.buckets) + 1))
+                self._series[key] = series
+            series.counts[bisect_left(self.buckets, value)] += 1
+            series.count += 1
+            series.sum += value
+            series.max = max(series.max, value)
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def totals(self, **match: Any) -> Tuple[int, float, float]:
+        """
+        Sum count, total and max over every series whose labels include ``match``.
+        """
+        wanted = set(_label_key(match))
+        count, total, peak = 0, 0.0, 0.0
+        with self._lock:
+            for key, series in self._series.items():
+                if wanted <= set(key):
+                    count += series.count
+                    total += series.sum
+                    peak = max(peak, series.max)
+        return count, total, peak
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "labels": dict(key),
+                    "count": series.count,
+                    "sum": series.sum,
+                    "max": series.max,
+                    "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], series.counts)),
+                }
+                for key, series in self._series.items()
+            ]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(list(self.buckets) + ["+Inf"], series.counts):
+                    cumulative += bucket_count
+                    le = bound if isinstance(bound, str) else f"{bound:g}"
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', le)])} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series.sum:g}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series.count}")
+        return lines
+
+class MetricsRegistry:
+    """
+    Process-wide collection of counters and histograms.
+
+    Instrumented modules create their metrics at import time; sinks read
+    snapshots from here, so recording a value never does any I/O.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Counter | Histogram] = {}
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+
+    def _get_or_create(self, name: str, factory: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = factory()
+                self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, help))
+
+    def histogram(self, name: str, help: str = "", buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, help, tuple(buckets)))
+
+    def get(self, name: str) -> Optional[Counter | Histogram]:
+        with self._lock:
+            return self._metrics.get(name)
+
+    def reset(self) -> None:
+        """Zero every metric, e.g. between jobs of a long-lived worker."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            self.started = time.monotonic()
+        for metric in metrics:
+            metric.reset()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            "uptime_seconds": round(time.monotonic() - self.started, 3),
+            "counters": {m.name: m.snapshot() for m in metrics if isinstance(m, Counter)},
+            "histograms": {m.name: m.snapshot() for m in metrics if isinstance(m, Histogram)},
+        }
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+def counter(name: str, help: str = "") -> Counter:
+    return REGISTRY.counter(name, help)
+
+def histogram(name: str, help: str = "", buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+    return REGISTRY.histogram(name, help, buckets)
+
+class MetricsSink:
+    """Base class for exporters that publish registry snapshots."""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY) -> None:
+        self.registry = registry
+
+    def start(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+class JsonFileSink(MetricsSink):
+    """
+    Rewrites a JSON snapshot of the registry every ``interval`` seconds and
+    once more on close. The file is replaced atomically, so readers never see
+    a partial write.
+    """
+
+    def __init__(self, path: str | Path, interval: float = 10.0, registry: MetricsRegistry = REGISTRY) -> None:
+        super().__init__(registry)
+        self.path = Path(path)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self.registry.snapshot(), indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError as exc:
+                logger.warning("Failed to write metrics to '%s': %s", self.path, exc)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="metrics-json", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write()
+        logger.info("Wrote metrics to '%s'.", self.path)
+
+class PrometheusSink(MetricsSink):
+    """Serves the registry in Prometheus text format at ``/metrics``."""
+
+    def __init__(self, port: int, host: str = "127.0.0.1", registry: MetricsRegistry = REGISTRY) -> None:
+        super().__init__(registry)
+        self.host = host
+        self.port = port
+        self._server: Optional["ThreadingHTTPServer"] = None
+
+    def start(self) -> None:
+        # Imported here: http.server is slow to load and most runs don't serve metrics.
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info("Serving Prometheus metrics at http://%s:%d/metrics", self.host, self._server.server_address[1])
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+def sinks_from_config(config: Dict[str, Any], registry: MetricsRegistry = REGISTRY) -> List[MetricsSink]:
+    metrics_cfg = config.get("metrics") or {}
+    sinks: List[MetricsSink] = []
+    if metrics_cfg.get("json_path"):
+        sinks.append(
+            JsonFileSink(
+                metrics_cfg["json_path"],
+                interval=float(metrics_cfg.get("json_interval", 10)),
+                registry=registry,
+            )
+        )
+    if metrics_cfg.get("prometheus_port"):
+        sinks.append(
+            PrometheusSink(
+                int(metrics_cfg["prometheus_port"]),
+                host=metrics_cfg.get("prometheus_host") or "127.0.0.1",
+                registry=registry,
+            )
+        )
+    return sinks
+
+# (label, histogram, label filter) rows of the --profile report.
+PROFILE_STAGES = (
+    ("search fetch", "http_request_seconds", {"source": "search"}),
+    ("search parse", "parse_seconds", {"kind": "search"}),
+    ("website fetch", "http_request_seconds", {"source": "website"}),
+    ("website parse", "parse_seconds", {"kind": "website"}),
+    ("rate limit wait", "rate_limit_wait_seconds", {}),
+    ("proxy wait", "proxy_wait_seconds", {}),
+    ("scan_website", "scan_website_seconds", {}),
+)
+
+def profile_report(wall_seconds: float, registry: MetricsRegistry = REGISTRY) -> Dict[str, Any]:
+    stages: Dict[str, Dict[str, float]] = {}
+    for label, name, match in PROFILE_STAGES:
+        metric = registry.get(name)
+        if not isinstance(metric, Histogram):
+            continue
+        count, total, peak = metric.totals(**match)
+        stages[label] = {
+            "calls": count,
+            "total_s": round(total, 4),
+            "mean_ms": round(total / count * 1000, 2) if count else 0.0,
+            "max_ms": round(peak * 1000, 2),
+        }
+    return {"wall_s": round(wall_seconds, 4), "stages": stages}
+
+def write_profile(report: Dict[str, Any], stream: TextIO, path: Optional[str | Path] = None) -> None:
+    """
+    Print the per-stage breakdown. Stage totals add up time across worker
+    threads, so they can exceed the wall time.
+    """
+    stream.write(f"\nProfile (wall time {report['wall_s']:.2f}s; stage times summed over threads)\n")
+    stream.write(f"{'stage':<16} {'calls':>7} {'total s':>10} {'mean ms':>10} {'max ms':>10}\n")
+    for label, row in report["stages"].items():
+        stream.write(
+            f"{label:<16} {row['calls']:>7} {row['total_s']:>10.3f} {row['mean_ms']:>10.2f} {row['max_ms']:>10.2f}\n"
+        )
+    if path:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(report, indent=2), encoding="utf-8")
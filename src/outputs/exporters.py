@@ -1,83 +1,297 @@
-thonimport csv
+import csv
 import json
 import logging
+import os
+import time
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from outputs.sqlite_store import ResultStore  # type: ignore
+from records import NOT_FOUND, SOCIAL_PLATFORMS, BusinessRecord  # type: ignore
 
 logger = logging.getLogger(__name__)
 
+CORE_FIELDS = ["name", "address", "phone", "website", "emails"]
+# Fixed CSV schema so rows can be written as soon as each record is ready.
+CSV_FIELDS = CORE_FIELDS + [f"social_{p}" for p in SOCIAL_PLATFORMS] + ["listing_url"]
+
 def _ensure_parent_dir(path: Path) -> None:
     if not path.parent.exists():
         path.parent.mkdir(parents=True, exist_ok=True)
 
-def export_to_json(records: Iterable[Dict[str, Any]], output_path: Path) -> None:
-    data_list: List[Dict[str, Any]] = list(records)
-    _ensure_parent_dir(output_path)
+class RecordWriter:
+    """
+    Base class for streaming exporters.
 
-    try:
-        with output_path.open("w", encoding="utf-8") as f:
-            json.dump(data_list, f, indent=2, ensure_ascii=False)
-        logger.info("Successfully exported %d records to JSON at '%s'.", len(data_list), output_path)
-    except Exception as exc:  # noqa: BLE001
-        logger.error("Failed to export JSON to '%s': %s", output_path, exc)
-        raise
-
-def export_to_csv(records: Iterable[Dict[str, Any]], output_path: Path) -> None:
-    records_list: List[Dict[str, Any]] = list(records)
-    _ensure_parent_dir(output_path)
-
-    # Determine CSV columns. Start with core fields, then expand with any extras we see.
-    core_fields = ["name", "address", "phone", "website", "emails"]
-    social_platforms = [
-        "linkedin",
-        "facebook",
-        "twitter",
-        "tiktok",
-        "pinterest",
-        "instagram",
-    ]
-    fields = core_fields + [f"social_{p}" for p in social_platforms]
-
-    extra_keys = set()
-    for rec in records_list:
-        for key in rec.keys():
-            if key not in fields and key not in {"socialmedia"}:
-                extra_keys.add(key)
-    fields.extend(sorted(extra_keys))
-
-    def flatten_record(rec: Dict[str, Any]) -> Dict[str, Any]:
-        flat: Dict[str, Any] = {k: rec.get(k, "Not Found") for k in core_fields}
-        # Emails as semicolon-separated string
-        emails = rec.get("emails") or []
-        if isinstance(emails, list):
-            flat["emails"] = ";".join(emails)
+    Records are appended and flushed as they arrive, and the output is synced
+    to disk at most every ``fsync_interval`` seconds, so a crash loses at
+    most the last few records and other processes can tail the file during a
+    run. ``BusinessRecord`` objects are converted to their exported shape
+    here; plain dicts are written as given.
+
+    The default ``_open``, ``_flush``, ``_sync`` and ``_close`` hooks write
+    a text file at ``output_path``; writers storing records elsewhere
+    override them.
+    """
+
+    format_name = ""
+
+    def __init__(self, output_path: Path, fsync_interval: float = 5.0) -> None:
+        self.output_path = Path(output_path)
+        self.fsync_interval = fsync_interval
+        self.count = 0
+        self._closed = False
+        self._last_sync = time.monotonic()
+        _ensure_parent_dir(self.output_path)
+        self._open()
+        self._begin()
+
+    def _open(self) -> None:
+        self._file: TextIO = self.output_path.open("w", encoding="utf-8")
+
+    def _begin(self) -> None:
+        pass
+
+    def _prepare(self, record: BusinessRecord | Dict[str, Any]) -> Any:
+        """The shape ``_write_record`` takes records in."""
+        return record.to_dict() if isinstance(record, BusinessRecord) else record
+
+    def _write_record(self, record: Any) -> None:
+        raise NotImplementedError
+
+    def _end(self) -> None:
+        pass
+
+    def _flush(self) -> None:
+        self._file.flush()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _close(self) -> None:
+        self._file.close()
+
+    def write(self, record: BusinessRecord | Dict[str, Any]) -> None:
+        self._write_record(self._prepare(record))
+        self.count += 1
+        self._flush()
+        if time.monotonic() - self._last_sync >= self.fsync_interval:
+            self._sync()
+            self._last_sync = time.monotonic()
+
+    def write_all(self, records: Iterable[BusinessRecord | Dict[str, Any]]) -> int:
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._end()
+        self._sync()
+        self._close()
+        self._closed = True
+        logger.info(
+            "Successfully exported %d records to %s at '%s'.",
+            self.count,
+            self.format_name,
+            self.output_path,
+        )
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc is not None:
+            logger.error("Failed to export %s to '%s': %s", self.format_name, self.output_path, exc)
+        self.close()
+
+class JsonWriter(RecordWriter):
+    """Writes a JSON array, one pretty-printed record at a time."""
+
+    format_name = "JSON"
+
+    def _begin(self) -> None:
+        self._file.write("[")
+
+    def _write_record(self, record: Dict[str, Any]) -> None:
+        body = json.dumps(record, indent=2, ensure_ascii=False)
+        self._file.write(",\n" if self.count else "\n")
+        self._file.write("\n".join(f"  {line}" for line in body.splitlines()))
+
+    def _end(self) -> None:
+        self._file.write("\n]" if self.count else "]")
+
+class NdjsonWriter(RecordWriter):
+    """Writes one JSON object per line (JSON Lines)."""
+
+    format_name = "NDJSON"
+
+    def _write_record(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write("\n")
+
+def flatten_record(rec: Dict[str, Any]) -> Dict[str, Any]:
+    flat: Dict[str, Any] = {k: rec.get(k, NOT_FOUND) for k in CORE_FIELDS}
+    # Emails as semicolon-separated string
+    emails = rec.get("emails") or []
+    if isinstance(emails, list):
+        flat["emails"] = ";".join(emails)
+    else:
+        flat["emails"] = str(emails)
+
+    social = rec.get("socialmedia") or {}
+    if not isinstance(social, dict):
+        social = {}
+
+    for platform in SOCIAL_PLATFORMS:
+        links = social.get(platform) or []
+        if isinstance(links, list):
+            flat[f"social_{platform}"] = ";".join(links)
         else:
-            flat["emails"] = str(emails)
+            flat[f"social_{platform}"] = str(links)
+
+    flat["listing_url"] = rec.get("listing_url", "")
+    return flat
+
+def unflatten_record(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of ``flatten_record`` for rows read back from a CSV export."""
+    rec: Dict[str, Any] = {k: row.get(k) or NOT_FOUND for k in CORE_FIELDS}
+    rec["emails"] = (row.get("emails") or NOT_FOUND).split(";")
+    rec["socialmedia"] = {
+        platform: (row.get(f"social_{platform}") or NOT_FOUND).split(";") for platform in SOCIAL_PLATFORMS
+    }
+    rec["listing_url"] = row.get("listing_url") or NOT_FOUND
+    known = set(CSV_FIELDS)
+    for key, value in row.items():
+        if key not in known and key is not None:
+            rec[key] = value
+    return rec
+
+class CsvWriter(RecordWriter):
+    """
+    Writes flattened records against a fixed header. Keys outside the schema
+    are dropped unless listed in ``extra_fields``.
+    """
+
+    format_name = "CSV"
+
+    def __init__(
+        self,
+        output_path: Path,
+        fsync_interval: float = 5.0,
+        extra_fields: Optional[List[str]] = None,
+    ) -> None:
+        self.extra_fields = [f for f in (extra_fields or []) if f not in CSV_FIELDS]
+        super().__init__(output_path, fsync_interval)
+
+    def _open(self) -> None:
+        self._file = self.output_path.open("w", encoding="utf-8", newline="")
+
+    def _begin(self) -> None:
+        self._writer = csv.DictWriter(
+            self._file,
+            fieldnames=CSV_FIELDS + self.extra_fields,
+            extrasaction="ignore",
+        )
+        self._writer.writeheader()
+
+    def _write_record(self, record: Dict[str, Any]) -> None:
+        row = flatten_record(record)
+        for key in self.extra_fields:
+            row[key] = record.get(key, "")
+        self._writer.writerow(row)
 
-        social = rec.get("socialmedia") or {}
-        if not isinstance(social, dict):
-            social = {}
+class SqliteWriter(RecordWriter):
+    """
+    Upserts records into a ``ResultStore`` in batches of ``batch_size``, one
+    transaction per batch. ``query`` (keyword, location) is recorded for every
+    listing written while it is set.
+    """
 
-        for platform in social_platforms:
-            links = social.get(platform) or []
-            if isinstance(links, list):
-                flat[f"social_{platform}"] = ";".join(links)
-            else:
-                flat[f"social_{platform}"] = str(links)
+    format_name = "SQLite"
 
-        # Add remaining keys
-        for key in extra_keys:
-            flat[key] = rec.get(key, "")
+    def __init__(
+        self,
+        output_path: Path,
+        fsync_interval: float = 5.0,
+        batch_size: int = 500,
+        query: Optional[Tuple[str, str]] = None,
+    ) -> None:
+        self.batch_size = max(1, batch_size)
+        self.query = query
+        self._pending: List[BusinessRecord] = []
+        super().__init__(output_path, fsync_interval)
 
-        return flat
+    def _open(self) -> None:
+        self.store = ResultStore(self.output_path)
 
+    def _prepare(self, record: BusinessRecord | Dict[str, Any]) -> BusinessRecord:
+        return record if isinstance(record, BusinessRecord) else BusinessRecord.from_dict(record)
+
+    def _write_record(self, record: BusinessRecord) -> None:
+        self._pending.append(record)
+
+    def _flush(self) -> None:
+        if len(self._pending) >= self.batch_size:
+            self._sync()
+
+    def _sync(self) -> None:
+        self.store.upsert(self._pending, query=self.query)
+        self._pending = []
+
+    def _close(self) -> None:
+        self.store.close()
+
+    def set_query(self, query: Optional[Tuple[str, str]]) -> None:
+        """Record the following writes under another search."""
+        self._sync()
+        self.query = query
+
+WRITERS = {
+    "json": JsonWriter,
+    "csv": CsvWriter,
+    "ndjson": NdjsonWriter,
+    "jsonl": NdjsonWriter,
+    "sqlite": SqliteWriter,
+}
+
+def open_writer(fmt: str, output_path: Path, **kwargs: Any) -> RecordWriter:
     try:
-        with output_path.open("w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fields)
-            writer.writeheader()
-            for rec in records_list:
-                writer.writerow(flatten_record(rec))
-        logger.info("Successfully exported %d records to CSV at '%s'.", len(records_list), output_path)
-    except Exception as exc:  # noqa: BLE001
-        logger.error("Failed to export CSV to '%s': %s", output_path, exc)
-        raise
\ No newline at end of file
+        writer_cls = WRITERS[fmt.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported output format '{fmt}'.") from None
+    return writer_cls(Path(output_path), **kwargs)
+
+def read_records(input_path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Read records back from a previous export. The format is taken from the
+    file extension: .json, .ndjson/.jsonl or .csv.
+    """
+    input_path = Path(input_path)
+    suffix = input_path.suffix.lower()
+    with input_path.open("r", encoding="utf-8", newline="" if suffix == ".csv" else None) as f:
+        if suffix == ".json":
+            yield from json.load(f)
+        elif suffix in (".ndjson", ".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif suffix == ".csv":
+            for row in csv.DictReader(f):
+                yield unflatten_record(row)
+        else:
+            raise ValueError(f"Cannot read records from '{input_path}': unknown format '{suffix}'.")
+
+def export_to_json(records: Iterable[BusinessRecord | Dict[str, Any]], output_path: Path) -> int:
+    with JsonWriter(output_path) as writer:
+        return writer.write_all(records)
+
+def export_to_ndjson(records: Iterable[BusinessRecord | Dict[str, Any]], output_path: Path) -> int:
+    with NdjsonWriter(output_path) as writer:
+        return writer.write_all(records)
+
+def export_to_csv(records: Iterable[BusinessRecord | Dict[str, Any]], output_path: Path) -> int:
+    with CsvWriter(output_path) as writer:
+        return writer.write_all(records)
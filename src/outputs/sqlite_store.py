@@ -0,0 +1,280 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlparse
+
+from records import NO_CONTACT, SKIPPED, SOCIAL_PLATFORMS, BusinessRecord, ContactInfo, Listing  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    id INTEGER PRIMARY KEY,
+    listing_key TEXT NOT NULL UNIQUE,
+    listing_url TEXT,
+    name TEXT,
+    address TEXT,
+    phone TEXT,
+    website TEXT,
+    website_domain TEXT,
+    scanned INTEGER NOT NULL DEFAULT 0,
+    contact_checked_at TEXT,
+    contact_status TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS listings_website_domain ON listings (website_domain);
+CREATE INDEX IF NOT EXISTS listings_phone ON listings (phone);
+
+CREATE TABLE IF NOT EXISTS emails (
+    listing_id INTEGER NOT NULL REFERENCES listings (id) ON DELETE CASCADE,
+    email TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    PRIMARY KEY (listing_id, email)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS emails_domain ON emails (domain, listing_id);
+
+CREATE TABLE IF NOT EXISTS social_links (
+    listing_id INTEGER NOT NULL REFERENCES listings (id) ON DELETE CASCADE,
+    platform TEXT NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (listing_id, platform, url)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS social_links_platform ON social_links (platform, listing_id);
+
+CREATE TABLE IF NOT EXISTS listing_queries (
+    listing_id INTEGER NOT NULL REFERENCES listings (id) ON DELETE CASCADE,
+    keyword TEXT NOT NULL COLLATE NOCASE,
+    location TEXT NOT NULL COLLATE NOCASE,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (listing_id, keyword, location)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS listing_queries_location ON listing_queries (location, keyword);
+"""
+
+UPSERT_LISTING = """
+INSERT INTO listings (
+    listing_key, listing_url, name, address, phone, website, website_domain,
+    scanned, contact_checked_at, contact_status, first_seen, last_seen
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (listing_key) DO UPDATE SET
+    listing_url = excluded.listing_url,
+    name = excluded.name,
+    address = excluded.address,
+    phone = excluded.phone,
+    website = excluded.website,
+    website_domain = excluded.website_domain,
+    scanned = MAX(scanned, excluded.scanned),
+    contact_checked_at = COALESCE(excluded.contact_checked_at, contact_checked_at),
+    contact_status = CASE WHEN excluded.scanned THEN excluded.contact_status ELSE contact_status END,
+    last_seen = excluded.last_seen
+"""
+
+# SQLite's default limit on bound parameters is 999 on older builds.
+ID_CHUNK = 500
+
+def _host(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return None
+    host = (urlparse(url if "://" in url else f"http://{url}").hostname or "").lower()
+    return (host[4:] if host.startswith("www.") else host) or None
+
+def _chunks(items: Sequence[Any], size: int = ID_CHUNK) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+class ResultStore:
+    """
+    SQLite store of scraped listings and their contact data, kept across runs.
+
+    Listings are upserted by their listing key (the Yellow Pages listing URL,
+    or name, phone and address when there is none); emails, social links and
+    the queries that found each listing live in their own indexed tables, so
+    questions such as "every listing with a gmail.com address" or "every
+    listing with a Facebook page in Los Angeles" don't need a full scan.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(listings)")}
+        if "contact_status" not in columns:
+            # Stores created before contact_status existed.
+            self._conn.execute("ALTER TABLE listings ADD COLUMN contact_status TEXT")
+        self._lock = threading.Lock()
+
+    def upsert(self, records: Iterable[BusinessRecord], query: Optional[Tuple[str, str]] = None) -> int:
+        """
+        Insert or update a batch of records in one transaction.
+
+        A record without contact data (``contact`` is None, or a scan skipped
+        for lack of time) keeps whatever contact data the store already has
+        for that listing.
+
+        :param query: (keyword, location) of the search that found the records.
+        :return: Number of records written.
+        """
+        records = list(records)
+        if not records:
+            return 0
+        now = time.time()
+        rows = []
+        scanned = []
+        for record in records:
+            listing = record.listing
+            contact = record.contact if record.contact is not None and record.contact.status != SKIPPED else None
+            if contact is not None:
+                scanned.append((record.key_string(), contact))
+            rows.append(
+                (
+                    record.key_string(),
+                    listing.listing_url,
+                    listing.name,
+                    listing.address,
+                    listing.phone,
+                    listing.website,
+                    _host(listing.website),
+                    int(contact is not None),
+                    record.checked_at,
+                    contact.status if contact is not None else None,
+                    now,
+                    now,
+                )
+            )
+
+        with self._lock, self._conn:
+            self._conn.executemany(UPSERT_LISTING, rows)
+            ids = self._ids([row[0] for row in rows])
+            scanned = [(ids[key], contact) for key, contact in scanned]
+            for chunk in _chunks([listing_id for listing_id, _ in scanned]):
+                marks = ",".join("?" * len(chunk))
+                self._conn.execute(f"DELETE FROM emails WHERE listing_id IN ({marks})", chunk)
+                self._conn.execute(f"DELETE FROM social_links WHERE listing_id IN ({marks})", chunk)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO emails (listing_id, email, domain) VALUES (?, ?, ?)",
+                [
+                    (listing_id, email, email.rpartition("@")[2].lower())
+                    for listing_id, contact in scanned
+                    for email in contact.emails
+                ],
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO social_links (listing_id, platform, url) VALUES (?, ?, ?)",
+                [
+                    (listing_id, platform, url)
+                    for listing_id, contact in scanned
+                    for platform, links in zip(SOCIAL_PLATFORMS, contact.social)
+                    for url in links
+                ],
+            )
+            if query is not None:
+                keyword, location = query
+                self._conn.executemany(
+                    "INSERT INTO listing_queries (listing_id, keyword, location, last_seen) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (listing_id, keyword, location) DO UPDATE SET last_seen = excluded.last_seen",
+                    [(listing_id, keyword, location, now) for listing_id in set(ids.values())],
+                )
+        return len(records)
+
+    def _ids(self, keys: Sequence[str]) -> Dict[str, int]:
+        ids: Dict[str, int] = {}
+        for chunk in _chunks(list(dict.fromkeys(keys))):
+            marks = ",".join("?" * len(chunk))
+            for listing_id, key in self._conn.execute(
+                f"SELECT id, listing_key FROM listings WHERE listing_key IN ({marks})", chunk
+            ):
+                ids[key] = listing_id
+        return ids
+
+    def known(self, listings: Iterable[Listing]) -> Set[str]:
+        """Keys of those ``listings`` that any earlier run already stored."""
+        keys = [listing.key_string() for listing in listings]
+        with self._lock:
+            return set(self._ids(keys))
+
+    def new_only(self, pages: Iterable[List[Listing]]) -> Iterator[List[Listing]]:
+        """Drop listings the store already knows from each page of search results."""
+        skipped = 0
+        for page in pages:
+            known = self.known(page)
+            fresh = [listing for listing in page if listing.key_string() not in known]
+            skipped += len(page) - len(fresh)
+            yield fresh
+        logger.info("Skipped %d listings already in '%s'.", skipped, self.path)
+
+    def iter_records(
+        self,
+        keyword: Optional[str] = None,
+        location: Optional[str] = None,
+        email_domain: Optional[str] = None,
+        platform: Optional[str] = None,
+    ) -> Iterator[BusinessRecord]:
+        """
+        Yield stored records in the order they were first stored, optionally
+        limited to one search (keyword and/or location, case-insensitive), an
+        email domain or listings with a link on ``platform``.
+        """
+        where: List[str] = []
+        params: List[Any] = []
+        if keyword or location:
+            conditions = ["q.listing_id = l.id"]
+            for column, value in (("keyword", keyword), ("location", location)):
+                if value:
+                    conditions.append(f"q.{column} = ?")
+                    params.append(value)
+            where.append(f"EXISTS (SELECT 1 FROM listing_queries q WHERE {' AND '.join(conditions)})")
+        if email_domain:
+            where.append("EXISTS (SELECT 1 FROM emails e WHERE e.domain = ? AND e.listing_id = l.id)")
+            params.append(email_domain.lower().lstrip("@"))
+        if platform:
+            where.append("EXISTS (SELECT 1 FROM social_links s WHERE s.platform = ? AND s.listing_id = l.id)")
+            params.append(platform.lower())
+        sql = (
+            "SELECT id, name, address, phone, website, listing_url, scanned, contact_checked_at, contact_status"
+            " FROM listings l"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + " ORDER BY id"
+        )
+
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(ID_CHUNK)
+                contacts = self._contacts([row[0] for row in rows if row[6]])
+            if not rows:
+                return
+            for listing_id, name, address, phone, website, listing_url, scanned, checked_at, status in rows:
+                contact = contacts.get(listing_id, NO_CONTACT) if scanned else None
+                if contact is not None and status:
+                    contact = replace(contact, status=status)
+                yield BusinessRecord(Listing(name, address, phone, website, listing_url), contact, checked_at)
+
+    def _contacts(self, ids: Sequence[int]) -> Dict[int, ContactInfo]:
+        if not ids:
+            return {}
+        marks = ",".join("?" * len(ids))
+        emails: Dict[int, Set[str]] = defaultdict(set)
+        social: Dict[int, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        for listing_id, email in self._conn.execute(
+            f"SELECT listing_id, email FROM emails WHERE listing_id IN ({marks})", ids
+        ):
+            emails[listing_id].add(email)
+        for listing_id, platform, url in self._conn.execute(
+            f"SELECT listing_id, platform, url FROM social_links WHERE listing_id IN ({marks})", ids
+        ):
+            social[listing_id][platform].add(url)
+        return {listing_id: ContactInfo.from_found(emails[listing_id], social[listing_id]) for listing_id in ids}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Iterator, List
+
+from records import BusinessRecord, Listing  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+class _StageFailure:
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+async def stream_enriched_records(
+    pages: Iterator[List[Listing]],
+    enrich_record: Callable[[Listing], BusinessRecord],
+    workers: int = 8,
+    queue_size: int | None = None,
+) -> AsyncIterator[BusinessRecord]:
+    """
+    Run search pagination and contact scanning as concurrent streaming stages.
+
+    ``pages`` is a blocking iterator of search result pages (usually
+    ``YellowPagesScraper.iter_search_pages``) and ``enrich_record`` turns one
+    listing into an enriched record. Listings from each results page are
+    handed to the scanning workers while later pages are still being fetched,
+    in search order (``schedule.prioritize`` does not apply here). Enriched
+    records are yielded in search order. At most
+    ``queue_size + workers`` listings are queued, being scanned or waiting to
+    be yielded at any time, so memory does not grow with ``max_results``.
+    """
+    loop = asyncio.get_running_loop()
+    workers = max(1, workers)
+    queue_size = max(1, queue_size or workers * 2)
+
+    listing_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    result_queue: asyncio.Queue = asyncio.Queue()
+    # Released only once a record has been yielded, so slow websites at the
+    # head of the order apply backpressure all the way to pagination.
+    window = asyncio.Semaphore(queue_size + workers)
+
+    with ThreadPoolExecutor(max_workers=workers + 1, thread_name_prefix="pipeline") as executor:
+
+        async def produce() -> None:
+            index = 0
+            while True:
+                page_results = await loop.run_in_executor(executor, next, pages, None)
+                if page_results is None:
+                    break
+                for listing in page_results:
+                    await window.acquire()
+                    await listing_queue.put((index, listing))
+                    index += 1
+            logger.info("Search stage finished after %d listings.", index)
+            for _ in range(workers):
+                await listing_queue.put(_DONE)
+
+        async def scan() -> None:
+            while True:
+                item = await listing_queue.get()
+                if item is _DONE:
+                    await result_queue.put(_DONE)
+                    return
+                index, listing = item
+                record = await loop.run_in_executor(executor, enrich_record, listing)
+                await result_queue.put((index, record))
+
+        def report_failure(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is not None:
+                result_queue.put_nowait(_StageFailure(task.exception()))
+
+        tasks = [loop.create_task(produce())] + [loop.create_task(scan()) for _ in range(workers)]
+        for task in tasks:
+            task.add_done_callback(report_failure)
+
+        pending: Dict[int, BusinessRecord] = {}
+        next_index = 0
+        finished_workers = 0
+        try:
+            while finished_workers < workers:
+                item = await result_queue.get()
+                if item is _DONE:
+                    finished_workers += 1
+                    continue
+                if isinstance(item, _StageFailure):
+                    raise item.exc
+
+                index, record = item
+                pending[index] = record
+                while next_index in pending:
+                    yield pending.pop(next_index)
+                    next_index += 1
+                    window.release()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,166 @@
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# What exports show for a field the scraper could not find. In memory a
+# missing value is always None; the placeholder only appears in output.
+NOT_FOUND = "Not Found"
+
+# Every record shares these interned keys; contact results store their links
+# positionally in this order instead of keeping a dict per record.
+SOCIAL_PLATFORMS: Tuple[str, ...] = tuple(
+    sys.intern(platform) for platform in ("linkedin", "facebook", "twitter", "tiktok", "pinterest", "instagram")
+)
+CHECKED_AT_FIELD = "contact_checked_at"
+# Set on contact results that a time budget cut short: "partial" when the
+# crawl stopped early, "skipped" when the site was never fetched.
+CONTACT_STATUS_FIELD = "contact_status"
+PARTIAL = "partial"
+SKIPPED = "skipped"
+
+def _missing(value: Any) -> bool:
+    return value is None or value == "" or value == NOT_FOUND
+
+def _text(value: Any) -> Optional[str]:
+    return None if _missing(value) else str(value)
+
+def _links(values: Any) -> Tuple[str, ...]:
+    if isinstance(values, str):
+        values = [values]
+    return tuple(value for value in values or () if not _missing(value))
+
+def _export_links(links: Tuple[str, ...]) -> List[str]:
+    return list(links) if links else [NOT_FOUND]
+
+@dataclass(slots=True)
+class Listing:
+    """One business listing from a search results page."""
+
+    name: Optional[str] = None
+    address: Optional[str] = None
+    phone: Optional[str] = None
+    website: Optional[str] = None
+    listing_url: Optional[str] = None
+
+    def key(self) -> Tuple[str, ...]:
+        """Identity of a listing across pages, queries and runs."""
+        if self.listing_url:
+            return (self.listing_url,)
+        return (self.name or NOT_FOUND, self.phone or NOT_FOUND, self.address or NOT_FOUND)
+
+    def key_string(self) -> str:
+        """``key()`` as one string, for journals and database columns."""
+        return "|".join(self.key())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name or NOT_FOUND,
+            "address": self.address or NOT_FOUND,
+            "phone": self.phone or NOT_FOUND,
+            "website": self.website or NOT_FOUND,
+            "listing_url": self.listing_url or NOT_FOUND,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Listing":
+        return cls(
+            name=_text(data.get("name")),
+            address=_text(data.get("address")),
+            phone=_text(data.get("phone")),
+            website=_text(data.get("website")),
+            listing_url=_text(data.get("listing_url")),
+        )
+
+@dataclass(slots=True, frozen=True)
+class ContactInfo:
+    """
+    Emails and social profile links found on a business website.
+
+    Immutable, so one scan result can be shared by every listing that points
+    at the same site. ``social`` holds one tuple of links per entry of
+    ``SOCIAL_PLATFORMS``, in that order. ``status`` is None for a finished
+    scan, else ``PARTIAL`` or ``SKIPPED``.
+    """
+
+    emails: Tuple[str, ...] = ()
+    social: Tuple[Tuple[str, ...], ...] = ((),) * len(SOCIAL_PLATFORMS)
+    status: Optional[str] = None
+
+    def links(self, platform: str) -> Tuple[str, ...]:
+        return self.social[SOCIAL_PLATFORMS.index(platform)]
+
+    def platforms_found(self) -> int:
+        return sum(1 for links in self.social if links)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "emails": _export_links(self.emails),
+            "socialmedia": {
+                platform: _export_links(links) for platform, links in zip(SOCIAL_PLATFORMS, self.social)
+            },
+        }
+        if self.status:
+            data[CONTACT_STATUS_FIELD] = self.status
+        return data
+
+    @classmethod
+    def from_found(
+        cls, emails: Iterable[str], social: Mapping[str, Iterable[str]], status: Optional[str] = None
+    ) -> "ContactInfo":
+        """Build a result from the raw sets a crawl collects, sorting each one."""
+        return cls(
+            emails=tuple(sorted(emails)),
+            social=tuple(tuple(sorted(social.get(platform, ()))) for platform in SOCIAL_PLATFORMS),
+            status=status,
+        )
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "ContactInfo":
+        social = data.get("socialmedia") or {}
+        if not isinstance(social, Mapping):
+            social = {}
+        return cls(
+            emails=_links(data.get("emails")),
+            social=tuple(_links(social.get(platform)) for platform in SOCIAL_PLATFORMS),
+            status=_text(data.get(CONTACT_STATUS_FIELD)),
+        )
+
+NO_CONTACT = ContactInfo()
+SKIPPED_CONTACT = ContactInfo(status=SKIPPED)
+
+@dataclass(slots=True)
+class BusinessRecord:
+    """
+    A listing together with its contact scan result.
+
+    Records reference their listing and contact data rather than copying
+    them, and are turned into the JSON/CSV shape only by ``to_dict`` at
+    export time.
+    """
+
+    listing: Listing
+    contact: Optional[ContactInfo] = None
+    checked_at: Optional[str] = None
+
+    def key(self) -> Tuple[str, ...]:
+        return self.listing.key()
+
+    def key_string(self) -> str:
+        return self.listing.key_string()
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = self.listing.to_dict()
+        if self.contact is not None:
+            data.update(self.contact.to_dict())
+        if self.checked_at:
+            data[CHECKED_AT_FIELD] = self.checked_at
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "BusinessRecord":
+        has_contact = "emails" in data or "socialmedia" in data
+        return cls(
+            listing=Listing.from_dict(data),
+            contact=ContactInfo.from_dict(data) if has_contact else None,
+            checked_at=_text(data.get(CHECKED_AT_FIELD)),
+        )
@@ -0,0 +1,149 @@
+import json
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from extractors.contact_scanner import clean_website_url  # type: ignore
+from outputs.exporters import read_records  # type: ignore
+from records import BusinessRecord, Listing  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+DETAIL_FIELDS = ("name", "phone", "address")
+
+def _format_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def _parse_time(value: Any) -> Optional[float]:
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def _phone_key(listing: Listing) -> str:
+    return re.sub(r"\D", "", listing.phone or "")
+
+def _website_key(listing: Listing) -> str:
+    return clean_website_url(listing.website) if listing.website else ""
+
+class RefreshPlan:
+    """
+    Decides which listings of a new search need their contact data rescanned.
+
+    Current listings are matched to the previous output by ``listing_key``
+    and, failing that, by phone number. A listing is scanned again when it is
+    new, when its website changed, or when its contact data is missing,
+    incomplete (``contact_status`` set) or older than ``max_age`` seconds;
+    otherwise the previous contact data is carried over.
+    Previous records without a ``contact_checked_at`` timestamp are dated by
+    the previous file's modification time. Every decision is recorded for the
+    change report; reused listings whose name, phone or address changed are
+    also listed under "details_changed".
+    """
+
+    def __init__(self, previous: List[BusinessRecord], max_age: float, previous_mtime: float) -> None:
+        self.max_age = max_age
+        self.previous_mtime = previous_mtime
+        self.checked_at = _format_time(time.time())
+        self._by_key: Dict[Tuple[str, ...], BusinessRecord] = {}
+        self._by_phone: Dict[str, BusinessRecord] = {}
+        for record in previous:
+            self._by_key.setdefault(record.key(), record)
+            phone = _phone_key(record.listing)
+            if phone:
+                self._by_phone.setdefault(phone, record)
+        self._matched: set = set()
+        self._changes: Dict[str, List[Dict[str, Any]]] = {
+            "new": [],
+            "website_changed": [],
+            "stale": [],
+            "reused": [],
+            "details_changed": [],
+        }
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str | Path, max_age: float) -> "RefreshPlan":
+        path = Path(path)
+        previous = [BusinessRecord.from_dict(record) for record in read_records(path)]
+        logger.info("Loaded %d previous records from '%s'.", len(previous), path)
+        return cls(previous, max_age=max_age, previous_mtime=path.stat().st_mtime)
+
+    def _match(self, listing: Listing) -> Optional[BusinessRecord]:
+        previous = self._by_key.get(listing.key())
+        if previous is None:
+            phone = _phone_key(listing)
+            previous = self._by_phone.get(phone) if phone else None
+        return previous
+
+    def _note(self, kind: str, listing: Listing, **extra: Any) -> None:
+        entry = {"name": listing.name, "listing_url": listing.listing_url} | extra
+        with self._lock:
+            self._changes[kind].append(entry)
+
+    def reuse(self, listing: Listing) -> Optional[BusinessRecord]:
+        """
+        Return a record pairing ``listing`` with its previous contact data, or
+        None when it has to be scanned again.
+        """
+        previous = self._match(listing)
+        if previous is None:
+            self._note("new", listing)
+            return None
+        with self._lock:
+            self._matched.add(previous.key())
+
+        if _website_key(previous.listing) != _website_key(listing):
+            self._note("website_changed", listing, previous=previous.listing.website, current=listing.website)
+            return None
+        if previous.contact is None or previous.contact.status is not None:
+            # The previous run never scanned it, or ran out of time doing so.
+            self._note("stale", listing)
+            return None
+
+        checked_at = _parse_time(previous.checked_at) or self.previous_mtime
+        age = time.time() - checked_at
+        if age > self.max_age:
+            self._note("stale", listing, age_days=round(age / 86400, 1))
+            return None
+
+        changed = {
+            field: {"previous": getattr(previous.listing, field), "current": getattr(listing, field)}
+            for field in DETAIL_FIELDS
+            if getattr(previous.listing, field) != getattr(listing, field)
+        }
+        if changed:
+            self._note("details_changed", listing, fields=changed)
+        self._note("reused", listing)
+        return BusinessRecord(listing, previous.contact, previous.checked_at or _format_time(checked_at))
+
+    def stamp(self, record: BusinessRecord) -> BusinessRecord:
+        record.checked_at = self.checked_at
+        return record
+
+    def report(self) -> Dict[str, Any]:
+        removed = [
+            {"name": record.listing.name, "listing_url": record.listing.listing_url}
+            for key, record in self._by_key.items()
+            if key not in self._matched
+        ]
+        changes = self._changes | {"removed": removed}
+        summary = {kind: len(entries) for kind, entries in changes.items()}
+        summary["rescanned"] = summary["new"] + summary["website_changed"] + summary["stale"]
+        return {"generated_at": _format_time(time.time()), "summary": summary} | changes
+
+    def write_report(self, path: str | Path) -> Dict[str, Any]:
+        report = self.report()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        logger.info("Refresh summary: %s. Change report written to '%s'.", report["summary"], path)
+        return report
@@ -1,10 +1,14 @@
-thonimport argparse
+import argparse
+import contextlib
+import io
 import json
 import logging
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Tuple
 
 # Ensure src directory is on sys.path so we can import local modules
 CURRENT_FILE = Path(__file__).resolve()
@@ -13,9 +17,53 @@ SRC_DIR = CURRENT_FILE.parent
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from extractors.yellowpages_parser import YellowPagesScraper  # type: ignore
-from extractors.contact_scanner import ContactScanner  # type: ignore
-from outputs.exporters import export_to_json, export_to_csv  # type: ignore
+from records import (  # type: ignore
+    CHECKED_AT_FIELD,
+    CONTACT_STATUS_FIELD,
+    SKIPPED_CONTACT,
+    SOCIAL_PLATFORMS,
+    BusinessRecord,
+    Listing,
+)
+from scheduler import RunBudget, iter_prioritized  # type: ignore
+from metrics import REGISTRY, profile_report, sinks_from_config, write_profile  # type: ignore
+from extractors.proxy_pool import ASSIGNMENTS  # type: ignore
+
+# The network and parsing stack (requests, lxml, asyncio, ...) is imported by
+# the functions that use it, so --help, argument and config errors, and an
+# idle worker (--serve) start without loading it.
+if TYPE_CHECKING:
+    from extractors.contact_scanner import ContactScanner  # type: ignore
+    from extractors.http_client import HttpClient  # type: ignore
+    from extractors.parse_pool import ParsePool  # type: ignore
+    from extractors.yellowpages_parser import YellowPagesScraper  # type: ignore
+    from outputs.exporters import RecordWriter  # type: ignore
+    from checkpoint import CheckpointJournal  # type: ignore
+    from refresh import RefreshPlan  # type: ignore
+
+# Config sections that are merged key by key into the defaults.
+CONFIG_SECTIONS = (
+    "output",
+    "headers",
+    "http",
+    "dns",
+    "dead_hosts",
+    "proxies",
+    "rate_limit",
+    "pagination",
+    "parse",
+    "schedule",
+    "pipeline",
+    "cache",
+    "scan",
+    "scan_store",
+    "refresh",
+    "store",
+    "checkpoint",
+    "batch",
+    "metrics",
+)
+OUTPUT_FORMATS = ("json", "csv", "ndjson", "jsonl", "sqlite")
 
 def setup_logging(verbosity: int) -> None:
     level = logging.WARNING
@@ -28,19 +76,118 @@ def setup_logging(verbosity: int) -> None:
         level=level,
         format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
     )
+    # basicConfig only configures logging once; a --serve worker runs many jobs.
+    logging.getLogger().setLevel(level)
 
-def load_config(config_path: str | None) -> Dict[str, Any]:
+def load_config(config_path: str | None, strict: bool = False) -> Dict[str, Any]:
+    """
+    :param strict: Raise ValueError for a config file that is missing or
+        cannot be read, instead of logging it and using the defaults.
+    """
     default_config = {
         "base_url": "https://www.yellowpages.com",
         "timeout": 15,
         "request_delay": 0.0,
         "max_results": 50,
         "sort": "bestmatch",
-        "proxy": None,
+        "proxy": None,  # a single proxy URL for every request; see "proxies" for a pool
+        "workers": 8,
+        "http": {
+            "pool_connections": 10,
+            "pool_maxsize": 10,
+            "max_retries": 2,
+            "backoff_factor": 0.5,
+        },
+        "dns": {
+            "enabled": True,  # in-process resolver cache shared by every request
+            "ttl": 300,  # seconds to keep a resolved address
+            "negative_ttl": 300,  # seconds to remember that a name does not exist
+        },
+        "dead_hosts": {
+            "enabled": True,  # skip business websites that failed to resolve, refused connections or kept timing out
+            "ttl": 1800,  # seconds a dead host is skipped
+            "max_timeouts": 2,  # timeouts in a row before a host counts as dead
+        },
+        "proxies": {
+            "urls": [],  # proxy URLs to rotate through; a list in "proxy" is treated the same way
+            "file": None,  # file with one proxy URL per line
+            "assignment": "request",  # "request": best healthy proxy per request; "host": one proxy per host
+            "max_per_proxy": 4,  # concurrent requests per proxy, 0 = unlimited
+            "max_error_rate": 0.5,  # take a proxy out of rotation above this error rate...
+            "min_requests": 5,  # ...measured over at least this many requests
+            "max_consecutive_failures": 3,
+            "cooldown": 60,  # seconds before an evicted proxy is tried again; doubles on repeat failures
+            "max_cooldown": 900,
+            "failover": 2,  # retries through another proxy after a connection or read error
+        },
+        "rate_limit": {
+            "enabled": True,  # adaptive per-host token bucket; request_delay sets the Yellow Pages starting rate
+            "initial_rate": 5.0,  # requests per second per host
+            "min_rate": 0.2,
+            "max_rate": 20.0,
+            "increase": 0.25,  # added to a host's rate after each healthy response
+            "decrease": 0.5,  # rate multiplier after a 429/503
+            "burst": 4,
+        },
+        "pagination": {
+            "prefetch": 0,  # results pages fetched in parallel once the first page gives the total; 0 = one by one
+        },
+        "parse": {
+            "processes": 0,  # parse pages in this many worker processes; 0 = in the fetching threads, "auto" = all cores
+        },
+        "schedule": {
+            "prioritize": True,  # scan listings whose websites look quickest first; output order is unchanged (not with --pipeline)
+            "run_budget": 0,  # seconds for the whole run; unscanned listings are then marked "skipped"
+        },
+        "pipeline": {
+            "enabled": False,
+            "queue_size": None,  # defaults to 2 x workers
+        },
+        "cache": {
+            "enabled": False,
+            "path": "data/http_cache.sqlite",
+            "max_mb": 512,
+            "ttl": {"search": 86400, "website": 604800},  # seconds per source
+        },
+        "scan": {
+            "max_pages_per_site": 4,
+            "page_workers": None,  # follow-up page fetches shared across sites; defaults to 2 x workers
+            "site_deadline": 0,  # seconds per website, 0 = only the per-request timeout applies
+            "early_stop_platforms": None,  # e.g. ["facebook"]: stop once an email and these are found
+            "max_page_kb": 2048,  # stop reading a website page after this much; 0 = no limit
+            "html_only": True,  # skip PDFs, images, videos etc. based on Content-Type
+        },
+        "scan_store": {
+            "enabled": False,  # reuse website scans across runs
+            "path": "data/scan_store.sqlite",
+            "max_age_days": 30,
+        },
+        "refresh": {
+            "max_age_days": 30,  # with --refresh, rescan listings whose contact data is older than this
+        },
+        "store": {
+            "path": "data/results.sqlite",  # SQLite result store for --format sqlite, --new-only and --export
+            "batch_size": 500,  # records per insert transaction
+        },
+        "checkpoint": {
+            "enabled": False,  # journal progress so an interrupted run can be resumed
+            "path": "data/checkpoint.ndjson",
+        },
+        "batch": {
+            "concurrency": 4,  # queries paginating at the same time
+            "split_output": False,  # one output file per query instead of one combined file
+        },
+        "metrics": {
+            "json_path": None,  # periodically rewritten JSON snapshot of all counters and histograms
+            "json_interval": 10,
+            "prometheus_port": None,  # serve /metrics in Prometheus text format on this port
+            "prometheus_host": "127.0.0.1",
+        },
         "output": {
             "directory": "data",
-            "format": "json",  # json or csv
+            "format": "json",  # json, csv, ndjson or sqlite
             "filename_prefix": "yellowpages_results",
+            "fsync_interval": 5.0,  # seconds between fsyncs while streaming records
         },
         "headers": {
             "User-Agent": (
@@ -56,93 +203,537 @@ def load_config(config_path: str | None) -> Dict[str, Any]:
 
     config_file = Path(config_path)
     if not config_file.is_file():
+        if strict:
+            raise ValueError(f"Config file '{config_path}' not found.")
         logging.warning("Config file '%s' not found. Using default configuration.", config_path)
         return default_config
 
     try:
         with config_file.open("r", encoding="utf-8") as f:
             user_config = json.load(f)
+        if not isinstance(user_config, dict):
+            raise ValueError("expected a JSON object")
         # shallow merge user config into default
         merged = default_config | {k: v for k, v in user_config.items() if v is not None}
-        # nested output & headers merge
-        if "output" in user_config:
-            merged["output"] = default_config["output"] | user_config["output"]
-        if "headers" in user_config:
-            merged["headers"] = default_config["headers"] | user_config["headers"]
+        # nested sections merge
+        for section in CONFIG_SECTIONS:
+            if section in user_config:
+                if not isinstance(user_config[section], dict):
+                    raise ValueError(f"section '{section}' must be a JSON object")
+                merged[section] = default_config[section] | user_config[section]
         return merged
     except Exception as exc:  # noqa: BLE001
+        if strict:
+            raise ValueError(f"Failed to read config file '{config_path}': {exc}") from exc
         logging.error("Failed to read config file '%s': %s", config_path, exc)
         return default_config
 
-def enrich_with_contacts(
-    base_records: List[Dict[str, Any]],
+def _number_error(name: str, value: Any, integer: bool = False, positive: bool = False) -> str | None:
+    kind = int if integer else (int, float)
+    if isinstance(value, bool) or not isinstance(value, kind) or value < 0 or (positive and value == 0):
+        expected = f"{'a positive' if positive else 'a non-negative'} {'integer' if integer else 'number'}"
+        return f"{name} must be {expected}, not {value!r}."
+    return None
+
+def validate_config(config: Dict[str, Any]) -> List[str]:
+    """
+    Check the config values that would otherwise only fail once the run is
+    under way, so a bad config is reported before anything is fetched.
+
+    :return: One message per problem; empty when the config looks usable.
+    """
+    sections = {section: config.get(section) or {} for section in CONFIG_SECTIONS}
+    errors: List[str] = []
+    base_url = config.get("base_url")
+    if not isinstance(base_url, str) or not base_url.startswith(("http://", "https://")):
+        errors.append(f"base_url must be an http(s) URL, not {base_url!r}.")
+    checks = [
+        ("timeout", config.get("timeout"), False, True),
+        ("request_delay", config.get("request_delay") or 0, False, False),
+        ("max_results", config.get("max_results"), True, True),
+        ("workers", config.get("workers"), True, True),
+        ("pagination.prefetch", sections["pagination"].get("prefetch") or 0, True, False),
+        ("schedule.run_budget", sections["schedule"].get("run_budget") or 0, False, False),
+        ("scan.site_deadline", sections["scan"].get("site_deadline") or 0, False, False),
+    ]
+    errors.extend(error for error in (_number_error(*check) for check in checks) if error is not None)
+    fmt = sections["output"].get("format")
+    if fmt is not None and str(fmt).lower() not in OUTPUT_FORMATS:
+        errors.append(f"output.format must be one of {', '.join(OUTPUT_FORMATS)}, not {fmt!r}.")
+    assignment = sections["proxies"].get("assignment")
+    if assignment is not None and assignment not in ASSIGNMENTS:
+        errors.append(f"proxies.assignment must be one of {', '.join(ASSIGNMENTS)}, not {assignment!r}.")
+    processes = sections["parse"].get("processes") or 0
+    if processes != "auto" and _number_error("parse.processes", processes, integer=True) is not None:
+        errors.append(f"parse.processes must be a non-negative integer or \"auto\", not {processes!r}.")
+    return errors
+
+def validate_args(args: argparse.Namespace) -> List[str]:
+    """Check the command line the way ``validate_config`` checks the config."""
+    errors = []
+    if not serving(args) and not args.input_file and not args.export and not (args.keyword and args.location):
+        errors.append("--keyword and --location are required unless --input-file, --export or --serve is given.")
+    for flag, path in (("--input-file", args.input_file), ("--refresh", args.refresh), ("--proxy-file", args.proxy_file)):
+        if path and not Path(path).is_file():
+            errors.append(f"{flag}: file '{path}' not found.")
+    checks = [
+        ("--max-results", args.max_results, True, True),
+        ("--workers", args.workers, True, True),
+        ("--parse-processes", args.parse_processes, True, False),
+        ("--prefetch-pages", args.prefetch_pages, True, False),
+        ("--record-budget", args.record_budget, False, False),
+        ("--run-budget", args.run_budget, False, False),
+        ("--refresh-max-age", args.refresh_max_age, False, False),
+    ]
+    errors.extend(
+        error for error in (_number_error(*check) for check in checks if check[1] is not None) if error is not None
+    )
+    return errors
+
+def build_scanner(
     config: Dict[str, Any],
-) -> List[Dict[str, Any]]:
-    scanner = ContactScanner(
+    client: "HttpClient",
+    workers: int = 1,
+    parse_pool: "ParsePool | None" = None,
+) -> "ContactScanner":
+    from extractors.contact_scanner import ContactScanner  # type: ignore
+    from extractors.scan_store import scan_store_from_config  # type: ignore
+
+    scan_cfg = config.get("scan") or {}
+    return ContactScanner(
         timeout=config.get("timeout", 15),
         headers=config.get("headers") or {},
         proxy=config.get("proxy"),
+        max_pages_per_site=scan_cfg.get("max_pages_per_site", 4),
+        client=client,
+        store=scan_store_from_config(config),
+        page_workers=scan_cfg.get("page_workers") or 2 * workers,
+        site_deadline=scan_cfg.get("site_deadline") or 0.0,
+        early_stop_platforms=scan_cfg.get("early_stop_platforms"),
+        max_page_bytes=int(scan_cfg.get("max_page_kb", 2048)) * 1024,
+        html_only=scan_cfg.get("html_only", True),
+        parse_pool=parse_pool,
     )
 
-    enriched: List[Dict[str, Any]] = []
-    for record in base_records:
-        website = record.get("website") or "Not Found"
-        contact_data = scanner.scan_website(website)
-        combined = record | contact_data
-        enriched.append(combined)
-    return enriched
+def make_enricher(
+    scanner: "ContactScanner",
+    journal: "CheckpointJournal | None" = None,
+    refresh: "RefreshPlan | None" = None,
+    budget: RunBudget | None = None,
+) -> Callable[[Listing], BusinessRecord]:
+    def enrich_record(listing: Listing) -> BusinessRecord:
+        if journal is not None:
+            done = journal.enriched(listing)
+            if done is not None:
+                return done
+        if refresh is not None:
+            reused = refresh.reuse(listing)
+            if reused is not None:
+                return reused
+        if budget is not None and listing.website and budget.exhausted():
+            return BusinessRecord(listing, SKIPPED_CONTACT)
 
-def run_scraper(args: argparse.Namespace) -> None:
-    config = load_config(args.config)
-    setup_logging(args.verbose)
+        contact = scanner.scan_website(listing.website, deadline=budget.deadline if budget is not None else None)
+        enriched = BusinessRecord(listing, contact)
+        if refresh is not None:
+            enriched = refresh.stamp(enriched)
+        # Results cut short by a time budget stay out of the journal, so a resumed run scans them again.
+        if journal is not None and contact.status is None:
+            journal.record_enriched(enriched)
+        return enriched
 
-    scraper = YellowPagesScraper(
-        base_url=config.get("base_url", "https://www.yellowpages.com"),
-        timeout=config.get("timeout", 15),
-        headers=config.get("headers") or {},
-        proxy=config.get("proxy"),
-        request_delay=config.get("request_delay", 0.0),
+    return enrich_record
+
+def scan_cost(
+    scanner: "ContactScanner", journal: "CheckpointJournal | None" = None
+) -> Callable[[Listing], float | None]:
+    """Scheduling cost of a listing; None for listings that need no scan."""
+
+    def cost(listing: Listing) -> float | None:
+        if not listing.website or (journal is not None and journal.enriched(listing) is not None):
+            return None
+        return scanner.estimate_cost(listing.website)
+
+    return cost
+
+def iter_enriched(
+    base_records: List[Listing],
+    config: Dict[str, Any],
+    workers: int | None = None,
+    client: "HttpClient | None" = None,
+    journal: "CheckpointJournal | None" = None,
+    parse_pool: "ParsePool | None" = None,
+    refresh: "RefreshPlan | None" = None,
+    budget: RunBudget | None = None,
+) -> Iterator[BusinessRecord]:
+    """
+    Yield each listing merged with its contact data, in input order, as soon
+    as it (and every listing before it) has been scanned.
+
+    With ``schedule.prioritize`` on, listings without a website skip the
+    worker queue and the others are scanned cheapest first (see
+    ``ContactScanner.estimate_cost``), so a run budget is spent on the
+    listings most likely to finish. Estimates come from what the run has
+    learned so far (hosts seen, dead or already scanned); sites nothing is
+    known about yet are scanned in input order.
+    """
+    from extractors.http_client import client_from_config  # type: ignore
+
+    workers = max(1, int(workers or config.get("workers") or 1))
+    client = client or client_from_config(config, min_pool_size=workers)
+    scanner = build_scanner(config, client, workers, parse_pool)
+    enrich_record = make_enricher(scanner, journal, refresh, budget)
+
+    try:
+        if (config.get("schedule") or {}).get("prioritize", True):
+            yield from iter_prioritized(base_records, enrich_record, scan_cost(scanner, journal), workers=workers)
+            return
+        if workers == 1 or len(base_records) <= 1:
+            for record in base_records:
+                yield enrich_record(record)
+            return
+
+        logging.info("Enriching %d listings using %d workers.", len(base_records), workers)
+        # executor.map yields results in input order, so output stays stable
+        # regardless of which websites respond first.
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="enrich") as executor:
+            yield from executor.map(enrich_record, base_records)
+    finally:
+        scanner.close()
+
+def enrich_with_contacts(
+    base_records: List[Listing],
+    config: Dict[str, Any],
+    workers: int | None = None,
+    client: "HttpClient | None" = None,
+    parse_pool: "ParsePool | None" = None,
+    budget: RunBudget | None = None,
+) -> List[BusinessRecord]:
+    return list(
+        iter_enriched(base_records, config, workers=workers, client=client, parse_pool=parse_pool, budget=budget)
     )
 
+async def write_pipeline_records(writer: "RecordWriter", *stream_args: Any, **stream_kwargs: Any) -> int:
+    from pipeline import stream_enriched_records  # type: ignore
+
+    started = time.perf_counter()
+    async for record in stream_enriched_records(*stream_args, **stream_kwargs):
+        if not writer.count:
+            logging.info("First enriched record ready after %.2fs.", time.perf_counter() - started)
+        writer.write(record)
+    return writer.count
+
+def open_checkpoint(
+    args: argparse.Namespace,
+    config: Dict[str, Any],
+    max_results: int,
+    sort: str,
+) -> "CheckpointJournal | None":
+    from checkpoint import CheckpointJournal  # type: ignore
+
+    checkpoint_cfg = config.get("checkpoint") or {}
+    if not (args.resume or args.checkpoint or checkpoint_cfg.get("enabled")):
+        return None
+    return CheckpointJournal(
+        args.checkpoint or checkpoint_cfg.get("path") or "data/checkpoint.ndjson",
+        run={"keyword": args.keyword, "location": args.location, "max_results": max_results, "sort": sort},
+        resume=args.resume,
+    )
+
+def run_scraper(args: argparse.Namespace, config: Dict[str, Any] | None = None) -> None:
+    if config is None:
+        config = load_config(args.config)
+    setup_logging(args.verbose)
+
+    sinks = sinks_from_config(config)
+    for sink in sinks:
+        sink.start()
+    started = time.perf_counter()
+    try:
+        scrape(args, config)
+    finally:
+        for sink in sinks:
+            sink.close()
+        if args.profile:
+            report = profile_report(time.perf_counter() - started)
+            write_profile(report, sys.stderr, None if args.profile == "-" else args.profile)
+
+def store_path(args: argparse.Namespace, config: Dict[str, Any]) -> Path:
+    return Path(args.store or (config.get("store") or {}).get("path") or "data/results.sqlite")
+
+def export_from_store(args: argparse.Namespace, config: Dict[str, Any]) -> None:
+    from outputs.sqlite_store import ResultStore  # type: ignore
+
+    fmt = output_format(args, config)
+    if fmt == "sqlite":
+        raise SystemExit("--export writes json, csv or ndjson; pick one with --format.")
+    path = store_path(args, config)
+    if not path.is_file():
+        raise SystemExit(f"Result store '{path}' does not exist.")
+    store = ResultStore(path)
+    try:
+        records = store.iter_records(
+            keyword=args.keyword,
+            location=args.location,
+            email_domain=args.email_domain,
+            platform=args.platform,
+        )
+        # Stored records may carry contact_checked_at and contact_status; keep them as CSV columns.
+        with open_output(
+            config, fmt, resolve_output_path(args, config, fmt), extra_fields=[CHECKED_AT_FIELD, CONTACT_STATUS_FIELD]
+        ) as writer:
+            writer.write_all(records)
+    finally:
+        store.close()
+    report_saved(writer.count, writer.output_path)
+
+def scrape(args: argparse.Namespace, config: Dict[str, Any]) -> None:
+    if args.export:
+        export_from_store(args, config)
+        return
+
+    import asyncio
+
+    from extractors.http_client import client_from_config  # type: ignore
+    from extractors.parse_pool import parse_pool_from_config  # type: ignore
+    from extractors.yellowpages_parser import YellowPagesScraper  # type: ignore
+    from outputs.sqlite_store import ResultStore  # type: ignore
+    from refresh import RefreshPlan  # type: ignore
+
+    workers = max(1, int(args.workers or config.get("workers") or 1))
+    if args.cache:
+        config["cache"] = config["cache"] | {"enabled": True}
+    if args.proxy_file:
+        config["proxies"] = config["proxies"] | {"file": args.proxy_file}
+    if args.parse_processes is not None:
+        config["parse"] = config["parse"] | {"processes": args.parse_processes}
+    if args.prefetch_pages is not None:
+        config["pagination"] = config["pagination"] | {"prefetch": args.prefetch_pages}
+    if args.record_budget is not None:
+        config["scan"] = config["scan"] | {"site_deadline": args.record_budget}
+    if args.run_budget is not None:
+        config["schedule"] = config["schedule"] | {"run_budget": args.run_budget}
+    budget = RunBudget(float(config["schedule"].get("run_budget") or 0))
     max_results = args.max_results or config.get("max_results", 50)
     sort = args.sort or config.get("sort", "bestmatch")
 
+    if args.input_file:
+        if args.resume or args.refresh or args.new_only:
+            logging.warning(
+                "--resume, --refresh and --new-only apply to single-query runs only; ignoring them in batch mode."
+            )
+    else:
+        logging.info(
+            "Starting Yellow Pages scrape: keyword='%s', location='%s', max_results=%d, sort='%s'",
+            args.keyword,
+            args.location,
+            max_results,
+            sort,
+        )
+    refresh = None
+    if args.refresh and not args.input_file:
+        max_age_days = args.refresh_max_age if args.refresh_max_age is not None else config["refresh"]["max_age_days"]
+        refresh = RefreshPlan.from_file(args.refresh, max_age=float(max_age_days) * 86400.0)
+
+    completed = False
+    # Everything opened from here on is closed on the way out, however the
+    # run ends: the client installs a process-wide resolver hook and the
+    # parse pool runs worker processes, which must not outlive a --serve job.
+    with contextlib.ExitStack() as cleanup:
+        journal = None if args.input_file else open_checkpoint(args, config, max_results, sort)
+        if journal is not None:
+            # Reads ``completed`` when the run ends, not now.
+            cleanup.callback(lambda: journal.close(completed=completed))
+        # One pooled client for the whole run so Yellow Pages pagination and the
+        # website scans reuse connections instead of reconnecting per request.
+        client = client_from_config(config, min_pool_size=workers)
+        cleanup.callback(client.close)
+        parse_pool = parse_pool_from_config(config)
+        if parse_pool is not None:
+            cleanup.callback(parse_pool.close)
+
+        scraper = YellowPagesScraper(
+            base_url=config.get("base_url", "https://www.yellowpages.com"),
+            timeout=config.get("timeout", 15),
+            headers=config.get("headers") or {},
+            proxy=config.get("proxy"),
+            request_delay=config.get("request_delay", 0.0),
+            client=client,
+            parse_pool=parse_pool,
+            prefetch=int(config["pagination"].get("prefetch") or 0),
+        )
+
+        if args.input_file:
+            run_batch_mode(args, config, scraper, client, workers, max_results, sort, parse_pool, budget)
+            return
+
+        if journal is not None:
+            pages = journal.iter_pages(scraper, args.keyword, args.location, max_results, sort)
+        else:
+            pages = scraper.iter_search_pages(args.keyword, args.location, max_results, sort)
+        if args.new_only:
+            # max_results still counts every listing found, including skipped ones.
+            known_store = ResultStore(store_path(args, config))
+            cleanup.callback(known_store.close)
+            pages = known_store.new_only(pages)
+
+        fmt = output_format(args, config)
+        outfile = resolve_output_path(args, config, fmt)
+        pipeline_cfg = config.get("pipeline") or {}
+        extra_fields = [CHECKED_AT_FIELD] if refresh is not None else None
+        with open_output(
+            config, fmt, outfile, extra_fields=extra_fields, query=(args.keyword, args.location)
+        ) as writer:
+            if args.pipeline or pipeline_cfg.get("enabled"):
+                scanner = build_scanner(config, client, workers, parse_pool)
+                try:
+                    asyncio.run(
+                        write_pipeline_records(
+                            writer,
+                            pages,
+                            make_enricher(scanner, journal, refresh, budget),
+                            workers=workers,
+                            queue_size=pipeline_cfg.get("queue_size"),
+                        )
+                    )
+                finally:
+                    scanner.close()
+            else:
+                base_records = [listing for page_results in pages for listing in page_results]
+                logging.info("Found %d base listings. Enriching with contact details…", len(base_records))
+                writer.write_all(
+                    iter_enriched(
+                        base_records,
+                        config,
+                        workers=workers,
+                        client=client,
+                        journal=journal,
+                        parse_pool=parse_pool,
+                        refresh=refresh,
+                        budget=budget,
+                    )
+                )
+        completed = True
+    report_saved(writer.count, outfile)
+    if refresh is not None:
+        report_path = outfile.with_name(f"{outfile.stem}_changes.json")
+        summary = refresh.write_report(report_path)["summary"]
+        print(
+            f"Rescanned {summary['rescanned']} listings "
+            f"({summary['new']} new, {summary['website_changed']} website changed, {summary['stale']} stale), "
+            f"reused {summary['reused']}, removed {summary['removed']}. Changes: {report_path}"
+        )
+
+def run_batch_mode(
+    args: argparse.Namespace,
+    config: Dict[str, Any],
+    scraper: "YellowPagesScraper",
+    client: "HttpClient",
+    workers: int,
+    max_results: int,
+    sort: str,
+    parse_pool: "ParsePool | None" = None,
+    budget: RunBudget | None = None,
+) -> None:
+    from batch import load_queries, run_batch  # type: ignore
+
+    queries = load_queries(args.input_file)
+    if not queries:
+        logging.warning("No queries found in '%s'. Nothing to do.", args.input_file)
+        return
+
+    batch_cfg = config.get("batch") or {}
     logging.info(
-        "Starting Yellow Pages scrape: keyword='%s', location='%s', max_results=%d, sort='%s'",
-        args.keyword,
-        args.location,
+        "Starting batch scrape of %d queries from '%s': max_results=%d per query, sort='%s'",
+        len(queries),
+        args.input_file,
         max_results,
         sort,
     )
-    base_records = scraper.search(
-        keyword=args.keyword,
-        location=args.location,
+    combined, per_query = run_batch(
+        queries,
+        scraper,
+        enrich=lambda records: enrich_with_contacts(
+            records, config, workers=workers, client=client, parse_pool=parse_pool, budget=budget
+        ),
         max_results=max_results,
         sort=sort,
+        concurrency=batch_cfg.get("concurrency", 4),
     )
 
-    logging.info("Found %d base listings. Enriching with contact details…", len(base_records))
-    results = enrich_with_contacts(base_records, config)
+    fmt = output_format(args, config)
+    if fmt == "sqlite":
+        # One store holds every query; each listing remembers which searches found it.
+        outfile = resolve_output_path(args, config, fmt)
+        with open_output(config, fmt, outfile) as writer:
+            for query, results in per_query.items():
+                writer.set_query((query.keyword, query.location))
+                writer.write_all(results)
+        report_saved(writer.count, outfile)
+    elif args.split_output or batch_cfg.get("split_output"):
+        for query, results in per_query.items():
+            write_results(results, resolve_output_path(args, config, fmt, suffix=query.slug), fmt, config)
+    else:
+        write_results(combined, resolve_output_path(args, config, fmt), fmt, config)
+
+def output_format(args: argparse.Namespace, config: Dict[str, Any]) -> str:
+    return (args.format or config.get("output", {}).get("format") or "json").lower()
 
+def resolve_output_path(
+    args: argparse.Namespace,
+    config: Dict[str, Any],
+    fmt: str,
+    suffix: str | None = None,
+) -> Path:
     output_cfg = config.get("output", {})
+    if fmt == "sqlite" and not args.output:
+        return store_path(args, config)
+    if args.output:
+        outfile = Path(args.output)
+        if suffix:
+            outfile = outfile.with_name(f"{outfile.stem}_{suffix}{outfile.suffix}")
+        return outfile
+
     output_dir = Path(output_cfg.get("directory") or "data")
     output_dir.mkdir(parents=True, exist_ok=True)
-
     filename_prefix = output_cfg.get("filename_prefix") or "yellowpages_results"
+    if suffix:
+        filename_prefix = f"{filename_prefix}_{suffix}"
+    return output_dir / f"{filename_prefix}.{fmt}"
 
-    if args.output:
-        outfile = Path(args.output)
-    else:
-        outfile = output_dir / f"{filename_prefix}.{args.format or output_cfg.get('format', 'json')}"
+def open_output(
+    config: Dict[str, Any],
+    fmt: str,
+    outfile: Path,
+    extra_fields: List[str] | None = None,
+    query: Tuple[str, str] | None = None,
+) -> "RecordWriter":
+    from outputs.exporters import open_writer  # type: ignore
 
-    fmt = (args.format or output_cfg.get("format") or "json").lower()
-    if fmt == "csv":
-        export_to_csv(results, outfile)
-    else:
-        export_to_json(results, outfile)
+    output_cfg = config.get("output", {})
+    kwargs: Dict[str, Any] = {"fsync_interval": output_cfg.get("fsync_interval", 5.0)}
+    if fmt == "csv" and time_budgeted(config):
+        extra_fields = (extra_fields or []) + [CONTACT_STATUS_FIELD]
+    if fmt == "csv" and extra_fields:
+        # JSON records carry any extra keys as-is; CSV needs them as columns.
+        kwargs["extra_fields"] = extra_fields
+    if fmt == "sqlite":
+        kwargs["batch_size"] = int((config.get("store") or {}).get("batch_size", 500))
+        kwargs["query"] = query
+    return open_writer(fmt, outfile, **kwargs)
 
-    logging.info("Scraping complete. Saved %d records to '%s'.", len(results), outfile)
-    print(f"Saved {len(results)} records to {outfile}")
+def time_budgeted(config: Dict[str, Any]) -> bool:
+    """Whether a time budget may cut scans short, so records can carry a contact_status."""
+    return bool((config.get("scan") or {}).get("site_deadline") or (config.get("schedule") or {}).get("run_budget"))
+
+def write_results(results: Iterable[BusinessRecord], outfile: Path, fmt: str, config: Dict[str, Any]) -> None:
+    with open_output(config, fmt, outfile) as writer:
+        writer.write_all(results)
+    report_saved(writer.count, outfile)
+
+def report_saved(count: int, outfile: Path) -> None:
+    logging.info("Scraping complete. Saved %d records to '%s'.", count, outfile)
+    print(f"Saved {count} records to {outfile}")
 
 def build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
@@ -155,14 +746,24 @@ def build_arg_parser() -> argparse.ArgumentParser:
 
     parser.add_argument(
         "--keyword",
-        required=True,
+        default=None,
         help="Search term such as 'dentist', 'coffee shop', or 'plumber'.",
     )
     parser.add_argument(
         "--location",
-        required=True,
+        default=None,
         help="Location such as 'Los Angeles, CA' or ZIP code like '90001'.",
     )
+    parser.add_argument(
+        "--input-file",
+        default=None,
+        help="Batch mode: file with one 'keyword, location' query per line (see data/inputs.sample.txt).",
+    )
+    parser.add_argument(
+        "--split-output",
+        action="store_true",
+        help="In batch mode, write one output file per query instead of one combined file.",
+    )
     parser.add_argument(
         "--max-results",
         type=int,
@@ -175,6 +776,121 @@ def build_arg_parser() -> argparse.ArgumentParser:
         default=None,
         help="Sorting mode for Yellow Pages search results.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of websites to scan concurrently during enrichment (overrides config).",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help=(
+            "Stream listings from each results page straight into contact scanning (asyncio pipeline). "
+            "Listings are scanned in search order; schedule.prioritize does not apply."
+        ),
+    )
+    parser.add_argument(
+        "--parse-processes",
+        type=int,
+        default=None,
+        help="Parse pages in this many worker processes to use more cores (overrides config; 0 disables).",
+    )
+    parser.add_argument(
+        "--record-budget",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Time allowed to scan one listing's website; cut-short scans are marked partial (overrides scan.site_deadline).",
+    )
+    parser.add_argument(
+        "--run-budget",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Time allowed for the whole run; listings not scanned by then are marked skipped (overrides config).",
+    )
+    parser.add_argument(
+        "--prefetch-pages",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Fetch up to N search results pages in parallel once the result count is known (overrides config).",
+    )
+    parser.add_argument(
+        "--proxy-file",
+        default=None,
+        help="Rotate requests through the proxies listed in this file, one URL per line (overrides config).",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Enable the on-disk HTTP response cache (see the 'cache' config section).",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Journal progress to this file so an interrupted run can be resumed (overrides config).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume from the checkpoint journal, skipping finished search pages and enriched listings.",
+    )
+    parser.add_argument(
+        "--refresh",
+        default=None,
+        metavar="PREVIOUS",
+        help=(
+            "Incremental refresh: reuse contact data from this previous output (json, ndjson or csv) and rescan "
+            "only new listings, changed websites and stale data. Writes a change report next to the output."
+        ),
+    )
+    parser.add_argument(
+        "--refresh-max-age",
+        type=float,
+        default=None,
+        metavar="DAYS",
+        help="With --refresh, rescan listings whose contact data is older than this many days (overrides config).",
+    )
+    parser.add_argument(
+        "--store",
+        default=None,
+        metavar="PATH",
+        help="SQLite result store used by --format sqlite, --new-only and --export (overrides config).",
+    )
+    parser.add_argument(
+        "--new-only",
+        action="store_true",
+        help="Skip listings that are already in the result store from earlier runs.",
+    )
+    parser.add_argument(
+        "--export",
+        action="store_true",
+        help=(
+            "Export records from the result store instead of scraping. --keyword, --location, --email-domain "
+            "and --platform narrow the export."
+        ),
+    )
+    parser.add_argument(
+        "--email-domain",
+        default=None,
+        help="With --export, only listings with an email address at this domain.",
+    )
+    parser.add_argument(
+        "--platform",
+        choices=list(SOCIAL_PLATFORMS),
+        default=None,
+        help="With --export, only listings with a link to this social platform.",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="PATH",
+        help="Print a per-stage timing breakdown at exit; with PATH, also write it there as JSON.",
+    )
     parser.add_argument(
         "--config",
         default=None,
@@ -182,15 +898,29 @@ def build_arg_parser() -> argparse.ArgumentParser:
     )
     parser.add_argument(
         "--format",
-        choices=["json", "csv"],
+        choices=list(OUTPUT_FORMATS),
         default=None,
-        help="Output format (json or csv). Overrides config.",
+        help="Output format (json, csv, ndjson/jsonl or sqlite, which upserts into the result store). Overrides config.",
     )
     parser.add_argument(
         "--output",
         default=None,
         help="Output file path. If not specified, constructed from config.",
     )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help=(
+            "Stay running as a worker: read jobs (runner.py arguments as JSON lines) from stdin and write one "
+            "JSON result line per job to stdout. See src/worker.py for the format."
+        ),
+    )
+    parser.add_argument(
+        "--serve-socket",
+        default=None,
+        metavar="PATH|HOST:PORT",
+        help="Like --serve, but take jobs over a unix socket at PATH or a TCP socket on HOST:PORT.",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -201,10 +931,74 @@ def build_arg_parser() -> argparse.ArgumentParser:
 
     return parser
 
+def serving(args: argparse.Namespace) -> bool:
+    return bool(getattr(args, "serve", False) or getattr(args, "serve_socket", None))
+
+def parse_command_line(
+    parser: argparse.ArgumentParser, argv: List[str] | None = None
+) -> Tuple[argparse.Namespace, Dict[str, Any]]:
+    """
+    Parse and validate the arguments and the config they point at; problems
+    exit through ``parser.error`` before the network stack is imported.
+    """
+    args = parser.parse_args(argv)
+    errors = validate_args(args)
+    try:
+        config = load_config(args.config, strict=True)
+    except ValueError as exc:
+        errors.append(str(exc))
+    else:
+        errors.extend(validate_config(config))
+    if errors:
+        parser.error(" ".join(errors))
+    return args, config
+
+def run_job(argv: List[str]) -> Dict[str, Any]:
+    """
+    Run one command line in this process, as a separate runner.py would, for
+    the --serve worker.
+
+    :return: ``exit_code``, what the job printed (``stdout``, and ``stderr``
+        for usage errors and --profile) and an ``error`` message (usage
+        errors, or the exception that ended the job) or None.
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    code, error = 0, None
+    root = logging.getLogger()
+    level = root.level
+    REGISTRY.reset()
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            parser = build_arg_parser()
+            args, config = parse_command_line(parser, argv)
+            if serving(args):
+                parser.error("--serve and --serve-socket cannot be used in a job.")
+            run_scraper(args, config)
+    except SystemExit as exc:
+        if isinstance(exc.code, int) or exc.code is None:
+            code = exc.code or 0
+            lines = stderr.getvalue().strip().splitlines()
+            error = lines[-1] if code and lines else None
+        else:
+            code, error = 1, str(exc.code)
+    except Exception as exc:  # noqa: BLE001
+        logging.exception("Job %s failed.", argv)
+        code, error = 1, f"{type(exc).__name__}: {exc}"
+    finally:
+        # Jobs set their own verbosity; the worker keeps its own.
+        root.setLevel(level)
+    return {"exit_code": code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "error": error}
+
 def main() -> None:
     parser = build_arg_parser()
-    args = parser.parse_args()
-    run_scraper(args)
+    args, config = parse_command_line(parser)
+    if serving(args):
+        from worker import serve  # type: ignore
+
+        setup_logging(args.verbose)
+        serve(run_job, args.serve_socket)
+        return
+    run_scraper(args, config)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,107 @@
+import heapq
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+@dataclass
+class RunBudget:
+    """
+    Time limit for a whole run, counted from ``started``; 0 means unlimited.
+    Listings each get ``scan.site_deadline`` on top of this.
+    """
+
+    seconds: float = 0.0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def deadline(self) -> Optional[float]:
+        return self.started + self.seconds if self.seconds > 0 else None
+
+    def exhausted(self) -> bool:
+        deadline = self.deadline
+        return deadline is not None and time.monotonic() >= deadline
+
+def iter_prioritized(
+    items: Sequence[T],
+    work: Callable[[T], R],
+    cost: Callable[[T], Optional[float]],
+    workers: int = 1,
+    rescore_interval: float = 0.5,
+) -> Iterator[R]:
+    """
+    Run ``work`` over ``items`` on ``workers`` threads, cheapest first, and
+    yield the results in input order.
+
+    ``cost`` estimates how long each item takes. Items costing None need no
+    worker at all (e.g. listings without a website): they are done on the
+    calling thread when their turn to be yielded comes, instead of waiting in
+    the queue behind slow ones. The rest are handed to the workers in order of
+    cost, ties in input order, so under a time budget the cheap items are done
+    before the budget runs out. Stopping the iteration early stops the workers
+    after the items they are working on.
+
+    Estimates are only as good as what ``cost`` knows, so the queued items
+    are re-scored as work finishes (at most every ``rescore_interval``
+    seconds) and a worker always takes the cheapest item by the latest
+    estimate. Items ``cost`` knows nothing about keep their input order.
+    """
+    queue: List[Tuple[float, int]] = []
+    for index, item in enumerate(items):
+        estimate = cost(item)
+        if estimate is not None:
+            queue.append((estimate, index))
+    heapq.heapify(queue)
+    futures: Dict[int, Future] = {index: Future() for _, index in queue}
+    lock = threading.Lock()
+    stop = threading.Event()
+    finished = 0
+    scored = (0, time.monotonic())  # items finished and the time at the last scoring
+    logger.debug("Scheduling %d of %d items on %d workers.", len(queue), len(items), workers)
+
+    def rescore() -> None:
+        nonlocal queue, scored
+        now = time.monotonic()
+        if finished == scored[0] or now - scored[1] < rescore_interval:
+            return
+        # An item that no longer needs a worker is simply done next.
+        queue = [(cost(items[index]) or 0.0, index) for _, index in queue]
+        heapq.heapify(queue)
+        scored = (finished, now)
+
+    def drain() -> None:
+        nonlocal finished
+        while not stop.is_set():
+            with lock:
+                if not queue:
+                    return
+                rescore()
+                _, index = heapq.heappop(queue)
+            future = futures[index]
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(work(items[index]))
+            except BaseException as exc:  # noqa: BLE001
+                future.set_exception(exc)
+            with lock:
+                finished += 1
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="enrich") as executor:
+        for _ in range(min(max(1, workers), len(queue))):
+            executor.submit(drain)
+        try:
+            for index, item in enumerate(items):
+                future = futures.get(index)
+                yield work(item) if future is None else future.result()
+        finally:
+            stop.set()
+            for future in futures.values():
+                future.cancel()
@@ -0,0 +1,142 @@
+import importlib
+import json
+import logging
+import os
+import socket
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Runs one runner.py command line; returns exit_code, stdout, stderr and error.
+JobRunner = Callable[[List[str]], Dict[str, Any]]
+
+# Imported once when the worker starts, so the first job does not pay for them.
+PRELOAD = (
+    "asyncio",
+    "extractors.http_client",
+    "extractors.yellowpages_parser",
+    "extractors.contact_scanner",
+    "extractors.parse_pool",
+    "extractors.scan_store",
+    "outputs.exporters",
+    "outputs.sqlite_store",
+    "pipeline",
+    "batch",
+    "checkpoint",
+    "refresh",
+)
+
+SHUTDOWN = "shutdown"
+
+def preload() -> None:
+    started = time.perf_counter()
+    for module in PRELOAD:
+        importlib.import_module(module)
+    logger.info("Worker ready; loaded the scraping stack in %.0f ms.", (time.perf_counter() - started) * 1000)
+
+def handle_line(run: JobRunner, line: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Run the job on one request line.
+
+    :return: The response (None for blank lines) and whether the client asked
+        the worker to shut down.
+    """
+    line = line.strip()
+    if not line:
+        return None, False
+    job_id = None
+    try:
+        job = json.loads(line)
+        if isinstance(job, list):
+            job = {"args": job}
+        if not isinstance(job, dict):
+            raise ValueError("expected a JSON object or a list of arguments")
+        job_id = job.get("id")
+        if job.get("command") == SHUTDOWN:
+            return {"id": job_id, "ok": True, "exit_code": 0}, True
+        argv = job.get("args")
+        if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+            raise ValueError('"args" must be a list of strings')
+    except ValueError as exc:
+        return {"id": job_id, "ok": False, "exit_code": 2, "error": f"Invalid job: {exc}"}, False
+
+    started = time.perf_counter()
+    result = run(argv)
+    seconds = time.perf_counter() - started
+    logger.info("Job %s finished with exit code %d in %.2fs.", job_id, result["exit_code"], seconds)
+    return {"id": job_id, "ok": result["exit_code"] == 0, **result, "seconds": round(seconds, 3)}, False
+
+def serve_stream(run: JobRunner, reader: TextIO, writer: TextIO) -> bool:
+    """
+    Answer jobs from ``reader`` on ``writer`` until end of input.
+
+    :return: Whether the client asked the worker to shut down.
+    """
+    for line in reader:
+        response, shutdown = handle_line(run, line)
+        if response is not None:
+            writer.write(json.dumps(response) + "\n")
+            writer.flush()
+        if shutdown:
+            return True
+    return False
+
+def _listen(address: str) -> socket.socket:
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit():
+        server = socket.create_server((host, int(port)))
+    else:
+        if os.path.exists(address):
+            os.unlink(address)  # left behind by a worker that did not shut down cleanly
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(address)
+        server.listen()
+    return server
+
+def serve_socket(run: JobRunner, address: str) -> None:
+    server = _listen(address)
+    logger.info("Worker listening on %s.", address)
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn, conn.makefile("r", encoding="utf-8") as reader, conn.makefile(
+                "w", encoding="utf-8"
+            ) as writer:
+                try:
+                    if serve_stream(run, reader, writer):
+                        return
+                except (BrokenPipeError, ConnectionResetError):
+                    logger.info("Client went away before reading its response.")
+    finally:
+        server.close()
+        if server.family == socket.AF_UNIX and os.path.exists(address):
+            os.unlink(address)
+
+def serve(run: JobRunner, address: Optional[str] = None) -> None:
+    """
+    Run jobs for a controller that would otherwise start runner.py once per
+    query, paying interpreter start-up and imports every time.
+
+    Each request is one JSON line, ``{"id": ..., "args": ["--keyword",
+    "plumbers", "--location", "Austin, TX"]}`` (a bare list of arguments also
+    works), and gets one JSON line back: ``{"id", "ok", "exit_code",
+    "stdout", "stderr", "error", "seconds"}``. ``{"command": "shutdown"}``
+    stops the worker. Jobs run one at a time, each as a full runner.py run
+    with its own --config; the worker's logs go to stderr.
+
+    :param address: None to read jobs from stdin and answer on stdout; a unix
+        socket path or HOST:PORT to accept connections there, one client at
+        a time.
+    """
+    preload()
+    try:
+        if address is None:
+            # Jobs print into a buffer of their own, so responses own stdout.
+            serve_stream(run, sys.stdin, sys.stdout)
+        else:
+            serve_socket(run, address)
+    except KeyboardInterrupt:
+        pass
+    logger.info("Worker stopped.")
@@ -0,0 +1,117 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+
+import pytest
+import requests
+
+from extractors.host_cache import DeadHosts, HostUnavailable  # type: ignore
+from extractors.http_client import HttpClient  # type: ignore
+
+class StubServer:
+    """
+    Loopback HTTP server that answers every GET after ``delay`` seconds. With
+    ``body_delay`` set, it stalls that long half-way through each body and
+    records the most bodies it was sending at once in ``peak_bodies``.
+    """
+
+    def __init__(self) -> None:
+        self.delay = 0.0
+        self.body_delay = 0.0
+        self.peak_bodies = 0
+        self._bodies = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                server.handle(self)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def handle(self, handler: BaseHTTPRequestHandler) -> None:
+        time.sleep(self.delay)
+        payload = b"<html><body>ok</body></html>"
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/html")
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        try:
+            if self.body_delay:
+                self._send_slowly(handler, payload)
+            else:
+                handler.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client timed out and hung up
+
+    def _send_slowly(self, handler: BaseHTTPRequestHandler, payload: bytes) -> None:
+        with self._lock:
+            self._bodies += 1
+            self.peak_bodies = max(self.peak_bodies, self._bodies)
+        handler.wfile.write(payload[:10])
+        handler.wfile.flush()
+        time.sleep(self.body_delay)
+        # Counted out before the last bytes go, so the client cannot start its
+        # next request while this one still looks in flight.
+        with self._lock:
+            self._bodies -= 1
+        handler.wfile.write(payload[10:])
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def server() -> Iterator[StubServer]:
+    stub = StubServer()
+    yield stub
+    stub.close()
+
+def test_search_timeouts_do_not_blacklist_the_search_host(server: StubServer) -> None:
+    client = HttpClient(timeout=0.2, max_retries=0, dead_hosts=DeadHosts(max_timeouts=2))
+    try:
+        server.delay = 0.5
+        for _ in range(3):
+            with pytest.raises(requests.RequestException) as raised:
+                client.get(server.url + "/search", source="search")
+            assert not isinstance(raised.value, HostUnavailable)
+
+        server.delay = 0.0
+        assert client.get(server.url + "/search", source="search").status_code == 200
+    finally:
+        client.close()
+
+def test_website_timeouts_blacklist_the_host(server: StubServer) -> None:
+    client = HttpClient(timeout=0.2, max_retries=0, dead_hosts=DeadHosts(max_timeouts=2))
+    try:
+        server.delay = 0.5
+        for _ in range(2):
+            with pytest.raises(requests.RequestException):
+                client.get(server.url + "/", source="website")
+
+        server.delay = 0.0
+        with pytest.raises(HostUnavailable):
+            client.get(server.url + "/", source="website")
+    finally:
+        client.close()
+
+def test_max_per_host_covers_the_body_download(server: StubServer) -> None:
+    client = HttpClient(max_per_host=1)
+    try:
+        server.body_delay = 0.2
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            responses = list(pool.map(lambda _: client.get(server.url + "/", source="website"), range(4)))
+        assert [resp.text for resp in responses] == ["<html><body>ok</body></html>"] * 4
+        assert server.peak_bodies == 1
+    finally:
+        client.close()